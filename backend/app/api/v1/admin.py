@@ -384,7 +384,7 @@ async def upload_global_document(
         tags=tags.split(",") if tags else [],
     )
     
-    # Upload global document
+    # Upload global document (the service queues it for processing)
     document = await document_service.upload_global_document(
         file=file,
         document_data=document_data,
@@ -393,14 +393,60 @@ async def upload_global_document(
         source=source,
     )
     
-    # Enqueue for processing with global flag
-    enqueue_document_processing(
-        document_id=document.id,
-        organization_id=None,  # No organization for global docs
-        is_global=True
+    return ProcessedDocumentResponse.model_validate(document)
+
+
+@router.post("/documents/global/bulk", response_model=List[ProcessedDocumentResponse])
+async def upload_global_documents_bulk(
+    files: List[UploadFile] = File(...),
+    document_type: str = Form(...),
+    source: str = Form(...),
+    tags: Optional[str] = Form(None),
+    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Upload several global documents in one request.
+    
+    Admin only endpoint. Each document is titled after its file name and
+    shares the given type, source and tags. Documents are created in a single
+    transaction and queued for processing.
+    """
+    # Validate document type
+    valid_types = ["standard", "regulation", "guideline", "best_practice", "other"]
+    if document_type not in valid_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid document type. Must be one of: {', '.join(valid_types)}"
+        )
+    
+    # Validate source
+    valid_sources = ["ISO", "NIST", "ZKS", "NIS2", "other"]
+    if source not in valid_sources:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid source. Must be one of: {', '.join(valid_sources)}"
+        )
+    
+    tag_list = tags.split(",") if tags else []
+    document_data_list = [
+        ProcessedDocumentCreate(
+            title=((file.filename or "").rsplit(".", 1)[0] or "Untitled")[:255],
+            tags=tag_list,
+        )
+        for file in files
+    ]
+    
+    document_service = DocumentService(db)
+    documents = await document_service.upload_global_documents_bulk(
+        files=files,
+        document_data_list=document_data_list,
+        uploaded_by=current_user.id,
+        document_type=document_type,
+        source=source,
     )
     
-    return ProcessedDocumentResponse.model_validate(document)
+    return [ProcessedDocumentResponse.model_validate(document) for document in documents]
 
 
 @router.get("/documents/global", response_model=DocumentListResponse)
@@ -195,8 +195,11 @@ async def get_document(
             detail=f"Document with ID {document_id} not found"
         )
     
-    # Count chunks
-    chunk_count = len(document.chunks) if hasattr(document, 'chunks') and document.chunks else 0
+    # Count chunks; they are only loaded when requested
+    if include_chunks:
+        chunk_count = len(document.chunks)
+    else:
+        chunk_count = await document_service.count_document_chunks(document_id)
     
     response_data = ProcessedDocumentResponse.model_validate(document)
     return ProcessedDocumentWithChunks(
@@ -27,7 +27,7 @@ async def import_control_scores(data_dir: str, clear_existing: bool = False):
             
             if clear_existing:
                 logger.warning("Clearing existing scoring data...")
-                await service.clear_existing_data()
+                await service.clear_existing_data(truncate=True)
             
             logger.info(f"Importing control scores from {data_dir}")
             stats = await service.import_all_data(data_dir)
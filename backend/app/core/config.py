@@ -52,6 +52,11 @@ class Settings(BaseSettings):
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
 
+    # Uploads
+    # Flush uploaded files to disk and drop them from the page cache once
+    # written (Linux only); trades a sync write for keeping hot pages cached
+    UPLOAD_FADVISE_DONTNEED: bool = False
+
     model_config = {"env_file": ".env", "case_sensitive": True}
 
 
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.core.utils import json_deserializer, json_serializer
 
 # Create async engine
 engine = create_async_engine(
@@ -12,6 +13,8 @@ engine = create_async_engine(
     echo=settings.DEBUG,
     poolclass=NullPool,  # For development simplicity
     future=True,
+    json_serializer=json_serializer,
+    json_deserializer=json_deserializer,
     connect_args={
         "server_settings": {
             "jit": "off",
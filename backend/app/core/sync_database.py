@@ -6,6 +6,7 @@ from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 
 from app.core.config import settings
+from app.core.utils import json_deserializer, json_serializer
 
 # Convert async URI to sync URI by removing asyncpg driver
 SYNC_DATABASE_URI = settings.DATABASE_URL.replace("+asyncpg", "")
@@ -16,6 +17,8 @@ sync_engine = create_engine(
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
+    json_serializer=json_serializer,
+    json_deserializer=json_deserializer,
     echo=settings.DEBUG
 )
 
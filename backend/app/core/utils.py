@@ -1,6 +1,41 @@
 """Core utility functions."""
+import hashlib
+from decimal import Decimal
+from typing import Any
+
+import orjson
+
 
 def to_camel(string: str) -> str:
     """Convert snake_case to camelCase."""
     components = string.split('_')
-    return components[0] + ''.join(x.title() for x in components[1:])
\ No newline at end of file
+    return components[0] + ''.join(x.title() for x in components[1:])
+
+
+def _orjson_default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def json_serializer(value: Any) -> str:
+    """Serialize JSON/JSONB column values with orjson."""
+    # OPT_NON_STR_KEYS keeps stdlib json's behaviour of stringifying int keys
+    return orjson.dumps(value, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def json_deserializer(value: str) -> Any:
+    """Deserialize JSON/JSONB column values with orjson."""
+    return orjson.loads(value)
+
+
+def stable_hash(value: Any) -> str:
+    """Hash a JSON-like value independent of dict key order, for cache keys."""
+    # BLAKE2b is faster than SHA-256 and 128 bits is plenty for cache keys
+    payload = orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC,
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
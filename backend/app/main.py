@@ -1,8 +1,13 @@
+import asyncio
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.api.v1.router import api_router
+from app.services.audit_queue import audit_queue
+from app.services.document_generation_service import shutdown_pdf_pool
+from app.services.keycloak_service import KeycloakService
 
 app = FastAPI(
     title="AI Self-Assessment Platform",
@@ -49,6 +54,21 @@ async def general_exception_handler(request: Request, exc: Exception):
 app.include_router(api_router)
 
 
+@app.on_event("shutdown")
+async def close_http_clients():
+    await KeycloakService.aclose()
+
+
+@app.on_event("shutdown")
+async def flush_audit_queue():
+    await audit_queue.close()
+
+
+@app.on_event("shutdown")
+async def close_pdf_pool():
+    await asyncio.to_thread(shutdown_pdf_pool)
+
+
 @app.get("/")
 async def root():
     return {"message": "AI Self-Assessment Platform API", "version": "0.1.0"}
@@ -9,11 +9,13 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import INET, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -161,6 +163,22 @@ class Assessment(BaseModel):
             "compliance_percentage IS NULL OR (compliance_percentage >= 0 AND compliance_percentage <= 100)",
             name="ck_assessment_valid_compliance_percentage",
         ),
+        # assigned_to is matched with @> (contains), which a B-tree cannot serve
+        Index("idx_assessments_assigned_to", "assigned_to", postgresql_using="gin"),
+        # Draft listings and statistics filter on status and organization and
+        # order by recency
+        Index(
+            "idx_assessments_status_org_updated",
+            "status",
+            "organization_id",
+            "updated_at",
+        ),
+        # Supports the cleanup of old abandoned drafts
+        Index(
+            "idx_assessments_abandoned_updated_at",
+            "updated_at",
+            postgresql_where=text("status = 'abandoned'"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 
-from sqlalchemy import String, Integer, Text, ForeignKey, Index, Boolean, CheckConstraint, Numeric, DateTime, UniqueConstraint
+from sqlalchemy import String, Integer, Text, ForeignKey, Index, Boolean, CheckConstraint, Numeric, DateTime, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -87,17 +87,24 @@ class ProcessedDocument(AsyncAttrs, BaseModel):
     )  # pending, processing, completed, failed, deleted
     
     # Timestamps
-    upload_date: Mapped[datetime] = mapped_column(nullable=False)
+    upload_date: Mapped[datetime] = mapped_column(nullable=False, server_default=func.now())
     processed_date: Mapped[Optional[datetime]] = mapped_column(nullable=True)
     
     # Processing metadata and information
     processing_metadata: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     
+    # BLAKE2b-128 hex digest of the file content, used to skip re-uploads
+    content_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    
     # Relationships
+    # Chunks carry embeddings, so they are only loaded explicitly (selectinload);
+    # deletes rely on the ON DELETE CASCADE foreign key instead of loading them
     chunks: Mapped[list["DocumentChunk"]] = relationship(
         "DocumentChunk", 
         back_populates="processed_document",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise",
+        passive_deletes=True,
     )
     
     # Indexes and constraints for performance and data integrity
@@ -106,12 +113,17 @@ class ProcessedDocument(AsyncAttrs, BaseModel):
         Index("idx_documents_scope_type", "scope", "document_type"),
         Index("idx_documents_global", "is_global", "status"),
         Index("idx_documents_upload_date", "upload_date"),
+        Index("idx_documents_org_content_hash", "organization_id", "content_hash"),
         CheckConstraint(
             "(scope = 'global' AND organization_id IS NULL AND is_global = true) OR "
             "(scope = 'organization' AND organization_id IS NOT NULL AND is_global = false)",
             name="check_document_scope_consistency"
         ),
     )
+    
+    # Fetch server-generated columns (upload_date) with RETURNING on insert,
+    # so flushed documents never need a lazy refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self) -> str:
         return f"<Document(id={self.id}, title='{self.title}', status='{self.status}')>"
@@ -2,11 +2,11 @@
 
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 
-from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy import and_, desc, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, selectinload
 
 from app.models.assessment import (
     Assessment,
@@ -93,12 +93,21 @@ class AssessmentRepository(BaseRepository[Assessment]):
         assigned_user_id: Optional[uuid.UUID] = None,
         created_after: Optional[datetime] = None,
         created_before: Optional[datetime] = None,
-        limit: int = 50,
+        updated_before: Optional[datetime] = None,
+        limit: Optional[int] = 50,
         offset: int = 0,
+        columns: Optional[List] = None,
     ) -> List[Assessment]:
-        """Search assessments with comprehensive filtering."""
+        """Search assessments with comprehensive filtering.
+
+        Pass ``limit=None`` to return every matching assessment. ``columns``
+        restricts the loaded attributes; any others must not be accessed.
+        """
         query = select(Assessment)
 
+        if columns:
+            query = query.options(load_only(*columns))
+
         conditions = []
 
         if organization_id:
@@ -128,14 +137,41 @@ class AssessmentRepository(BaseRepository[Assessment]):
         if created_before:
             conditions.append(Assessment.created_at <= created_before)
 
+        if updated_before:
+            conditions.append(Assessment.updated_at < updated_before)
+
         if conditions:
             query = query.where(and_(*conditions))
 
-        query = query.order_by(desc(Assessment.updated_at)).offset(offset).limit(limit)
+        query = query.order_by(desc(Assessment.updated_at)).offset(offset)
+
+        if limit is not None:
+            query = query.limit(limit)
 
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def stream_ids(
+        self,
+        status_list: Optional[List[str]] = None,
+        updated_before: Optional[datetime] = None,
+        batch_size: int = 200,
+    ) -> AsyncIterator[uuid.UUID]:
+        """Yield IDs of matching assessments from a server-side cursor."""
+        query = select(Assessment.id)
+
+        if status_list:
+            query = query.where(Assessment.status.in_(status_list))
+
+        if updated_before:
+            query = query.where(Assessment.updated_at < updated_before)
+
+        result = await self.db.stream_scalars(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for assessment_id in result:
+            yield assessment_id
+
     async def count_search_results(
         self,
         organization_id: Optional[uuid.UUID] = None,
@@ -145,6 +181,7 @@ class AssessmentRepository(BaseRepository[Assessment]):
         assigned_user_id: Optional[uuid.UUID] = None,
         created_after: Optional[datetime] = None,
         created_before: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
     ) -> int:
         """Count assessments matching search criteria."""
         query = select(func.count(Assessment.id))
@@ -178,12 +215,41 @@ class AssessmentRepository(BaseRepository[Assessment]):
         if created_before:
             conditions.append(Assessment.created_at <= created_before)
 
+        if updated_before:
+            conditions.append(Assessment.updated_at < updated_before)
+
         if conditions:
             query = query.where(and_(*conditions))
 
         result = await self.db.execute(query)
         return result.scalar_one()
 
+    async def touch_draft(self, assessment_id: uuid.UUID):
+        """Bump updated_at on a draft and return its summary columns.
+
+        Returns None if the assessment does not exist or is not a draft.
+        """
+        query = (
+            update(Assessment)
+            .where(
+                and_(
+                    Assessment.id == assessment_id,
+                    Assessment.status == "draft",
+                )
+            )
+            .values(updated_at=func.now())
+            .returning(
+                Assessment.id,
+                Assessment.title,
+                Assessment.security_level,
+                Assessment.total_controls,
+                Assessment.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(query)
+        return result.one_or_none()
+
     async def count_by_status(self, organization_id: uuid.UUID) -> Dict[str, int]:
         """Count assessments by status for an organization."""
         query = (
@@ -194,6 +260,66 @@ class AssessmentRepository(BaseRepository[Assessment]):
         result = await self.db.execute(query)
         return {status: count for status, count in result.all()}
 
+    async def get_draft_statistics_by_level(
+        self, organization_id: Optional[uuid.UUID] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Aggregate age and completion figures for drafts per security level.
+
+        Age is in whole days; completion comes from the most recent overall
+        progress record and counts as 0 when there is none. Sums rather than
+        averages are returned so the levels can be combined exactly.
+        """
+        age_days = func.floor(
+            func.extract("epoch", func.now() - Assessment.created_at) / 86400
+        )
+        completion = func.coalesce(
+            select(AssessmentProgress.completion_percentage)
+            .where(
+                and_(
+                    AssessmentProgress.assessment_id == Assessment.id,
+                    AssessmentProgress.measure_id.is_(None),
+                )
+            )
+            .order_by(desc(AssessmentProgress.updated_at))
+            .limit(1)
+            .scalar_subquery(),
+            0,
+        )
+
+        drafts = select(
+            Assessment.security_level,
+            age_days.label("age_days"),
+            completion.label("completion"),
+        ).where(Assessment.status == "draft")
+        if organization_id:
+            drafts = drafts.where(Assessment.organization_id == organization_id)
+        drafts = drafts.subquery()
+
+        query = select(
+            drafts.c.security_level,
+            func.count().label("count"),
+            func.sum(drafts.c.age_days).label("age_days_sum"),
+            func.max(drafts.c.age_days).label("oldest_days"),
+            func.min(drafts.c.age_days).label("newest_days"),
+            func.sum(drafts.c.completion).label("completion_sum"),
+            func.count().filter(drafts.c.completion > 50).label("over_half_complete"),
+            func.count().filter(drafts.c.completion < 10).label("barely_started"),
+        ).group_by(drafts.c.security_level)
+
+        result = await self.db.execute(query)
+        return {
+            row.security_level: {
+                "count": row.count,
+                "age_days_sum": float(row.age_days_sum),
+                "oldest_days": int(row.oldest_days),
+                "newest_days": int(row.newest_days),
+                "completion_sum": float(row.completion_sum),
+                "over_half_complete": row.over_half_complete,
+                "barely_started": row.barely_started,
+            }
+            for row in result.all()
+        }
+
     async def get_recent_activity(
         self, organization_id: uuid.UUID, days: int = 30, limit: int = 10
     ) -> List[Assessment]:
@@ -435,6 +561,17 @@ class AssessmentAuditRepository(BaseRepository[AssessmentAuditLog]):
     def __init__(self, db: AsyncSession):
         super().__init__(db, AssessmentAuditLog)
 
+    async def create_many(self, rows: List[Dict]) -> int:
+        """Insert several audit log entries in a single statement.
+
+        Unlike ``create`` this neither flushes nor refreshes instances, so the
+        caller is responsible for committing.
+        """
+        if not rows:
+            return 0
+        await self.db.execute(insert(AssessmentAuditLog), rows)
+        return len(rows)
+
     async def get_by_assessment(
         self, assessment_id: uuid.UUID, limit: int = 100, offset: int = 0
     ) -> List[AssessmentAuditLog]:
@@ -561,6 +698,31 @@ class AssessmentProgressRepository(BaseRepository[AssessmentProgress]):
         result = await self.db.execute(query)
         return result.scalars().first()
 
+    async def get_overall_progress_bulk(
+        self, assessment_ids: List[uuid.UUID]
+    ) -> Dict[uuid.UUID, AssessmentProgress]:
+        """Get overall progress for several assessments in one query.
+        
+        Mirrors get_overall_progress: the most recent overall record per
+        assessment. Assessments without progress are absent from the result.
+        """
+        if not assessment_ids:
+            return {}
+        
+        query = (
+            select(AssessmentProgress)
+            .where(
+                and_(
+                    AssessmentProgress.assessment_id.in_(assessment_ids),
+                    AssessmentProgress.measure_id.is_(None),
+                )
+            )
+            .order_by(AssessmentProgress.assessment_id, desc(AssessmentProgress.updated_at))
+            .distinct(AssessmentProgress.assessment_id)
+        )
+        result = await self.db.execute(query)
+        return {progress.assessment_id: progress for progress in result.scalars()}
+
     async def cleanup_duplicate_overall_progress(
         self, assessment_id: uuid.UUID
     ) -> int:
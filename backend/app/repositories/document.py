@@ -21,6 +21,54 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
     def __init__(self, db: AsyncSession):
         super().__init__(db, ProcessedDocument)
 
+    def _organization_filters(
+        self,
+        organization_id: UUID,
+        status: Optional[str] = None,
+        include_global: bool = False,
+        search_term: Optional[str] = None,
+    ) -> list:
+        """Build the WHERE clauses shared by organization listing, search and counting."""
+        if include_global:
+            # Include both organization documents and global documents
+            filters = [
+                or_(
+                    self.model.organization_id == organization_id,
+                    self.model.scope == "global"
+                )
+            ]
+        else:
+            # Only organization documents
+            filters = [self.model.organization_id == organization_id]
+        
+        if status:
+            filters.append(self.model.status == status)
+        
+        if search_term:
+            filters.append(self.model.title.ilike(f"%{search_term}%"))
+        
+        return filters
+
+    def _global_filters(
+        self,
+        status: Optional[str] = None,
+        document_type: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> list:
+        """Build the WHERE clauses shared by global document listing and counting."""
+        filters = [self.model.scope == "global"]
+        
+        if status:
+            filters.append(self.model.status == status)
+        
+        if document_type:
+            filters.append(self.model.document_type == document_type)
+            
+        if source:
+            filters.append(self.model.source == source)
+        
+        return filters
+
     async def get_by_organization(
         self,
         organization_id: UUID,
@@ -38,20 +86,9 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
             offset: Offset for pagination
             include_global: Whether to include global documents in results
         """
-        if include_global:
-            # Include both organization documents and global documents
-            query = select(self.model).where(
-                or_(
-                    self.model.organization_id == organization_id,
-                    self.model.scope == "global"
-                )
-            )
-        else:
-            # Only organization documents
-            query = select(self.model).where(self.model.organization_id == organization_id)
-        
-        if status:
-            query = query.where(self.model.status == status)
+        query = select(self.model).where(
+            *self._organization_filters(organization_id, status, include_global)
+        )
         
         query = query.order_by(desc(self.model.upload_date))
         
@@ -72,16 +109,9 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
         offset: int = 0,
     ) -> List[ProcessedDocument]:
         """Get all global documents with optional filters."""
-        query = select(self.model).where(self.model.scope == "global")
-        
-        if status:
-            query = query.where(self.model.status == status)
-        
-        if document_type:
-            query = query.where(self.model.document_type == document_type)
-            
-        if source:
-            query = query.where(self.model.source == source)
+        query = select(self.model).where(
+            *self._global_filters(status, document_type, source)
+        )
         
         query = query.order_by(desc(self.model.upload_date))
         
@@ -93,6 +123,20 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def count_global_documents(
+        self,
+        status: Optional[str] = None,
+        document_type: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> int:
+        """Count global documents matching the same filters as get_global_documents."""
+        query = select(func.count(self.model.id)).where(
+            *self._global_filters(status, document_type, source)
+        )
+        
+        result = await self.db.execute(query)
+        return result.scalar() or 0
+    
     async def create_global_document(
         self,
         title: str,
@@ -103,8 +147,10 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
         source: Optional[str] = None,
         mime_type: Optional[str] = None,
         processing_metadata: Optional[dict] = None,
+        content_hash: Optional[str] = None,
+        commit: bool = True,
     ) -> ProcessedDocument:
-        """Create a global document."""
+        """Create a global document, flushing instead of committing if commit is False."""
         document = ProcessedDocument(
             organization_id=None,  # Global documents have no organization
             scope="global",
@@ -116,16 +162,40 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
             document_type=document_type,
             source=source,
             mime_type=mime_type,
-            upload_date=datetime.utcnow(),
             status="pending",
-            processing_metadata=processing_metadata or {}
+            processing_metadata=processing_metadata or {},
+            content_hash=content_hash,
         )
         
         self.db.add(document)
-        await self.db.commit()
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.flush()
         await self.db.refresh(document)
         return document
 
+    async def create_global_documents(self, documents: List[dict]) -> List[ProcessedDocument]:
+        """Create several global documents in one flush.
+        
+        Each dict holds the create_global_document arguments. The caller is
+        responsible for committing.
+        """
+        instances = [
+            ProcessedDocument(
+                organization_id=None,  # Global documents have no organization
+                scope="global",
+                is_global=True,
+                status="pending",
+                **{**fields, "processing_metadata": fields.get("processing_metadata") or {}},
+            )
+            for fields in documents
+        ]
+        
+        self.db.add_all(instances)
+        await self.db.flush()
+        return instances
+
     async def get_with_chunks(self, document_id: UUID) -> Optional[ProcessedDocument]:
         """Get document with all its chunks loaded."""
         query = select(self.model).options(
@@ -135,31 +205,78 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def find_by_content_hash(
+        self,
+        content_hash: str,
+        organization_id: Optional[UUID] = None,
+    ) -> Optional[ProcessedDocument]:
+        """Find a usable document with the same content.
+        
+        Looks in the organization's documents, or among global documents when
+        organization_id is None. Failed documents are ignored so that
+        re-uploading them processes the file again.
+        """
+        if organization_id is None:
+            scope_filter = self.model.scope == "global"
+        else:
+            scope_filter = self.model.organization_id == organization_id
+        
+        query = select(self.model).where(
+            scope_filter,
+            self.model.content_hash == content_hash,
+            self.model.status != "failed",
+        ).order_by(desc(self.model.upload_date)).limit(1)
+        
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def count_chunks(self, document_id: UUID) -> int:
+        """Count a document's chunks without loading them."""
+        query = select(func.count(DocumentChunk.id)).where(
+            DocumentChunk.processed_document_id == document_id
+        )
+        
+        result = await self.db.execute(query)
+        return result.scalar() or 0
+
     async def search_by_title(
         self,
         organization_id: UUID,
         search_term: str,
+        status: Optional[str] = None,
         limit: Optional[int] = None,
-    ) -> List[ProcessedDocument]:
-        """Search documents by title."""
-        query = select(self.model).where(
-            and_(
-                self.model.organization_id == organization_id,
-                self.model.title.ilike(f"%{search_term}%")
-            )
-        ).order_by(desc(self.model.upload_date))
+        offset: int = 0,
+        include_global: bool = False,
+    ) -> tuple[List[ProcessedDocument], int]:
+        """Search documents by title.
         
+        Returns one page of matches and the total number of matches. Both
+        queries share this repository's session, so they run one after the
+        other.
+        """
+        filters = self._organization_filters(organization_id, status, include_global, search_term)
+        
+        query = select(self.model).where(*filters).order_by(desc(self.model.upload_date))
+        
+        if offset:
+            query = query.offset(offset)
         if limit:
             query = query.limit(limit)
         
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        documents = list(result.scalars().all())
+        
+        # A partial first page already holds every match
+        if not offset and (not limit or len(documents) < limit):
+            return documents, len(documents)
+        
+        count_result = await self.db.execute(
+            select(func.count(self.model.id)).where(*filters)
+        )
+        return documents, count_result.scalar() or 0
 
     async def get_processing_stats(self, organization_id: UUID) -> dict:
         """Get processing statistics for an organization."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         logger.info(f"[DOC_REPO] Getting processing stats for organization {organization_id}")
         
         # Count by status - ONLY organization documents (exclude global)
@@ -202,13 +319,15 @@ class ProcessedDocumentRepository(BaseRepository[ProcessedDocument]):
             "status_breakdown": status_breakdown or {},
         }
     
-    async def count_by_organization(self, organization_id: UUID) -> int:
-        """Count documents for a specific organization (excluding global documents)."""
+    async def count_by_organization(
+        self,
+        organization_id: UUID,
+        status: Optional[str] = None,
+        include_global: bool = False,
+    ) -> int:
+        """Count documents matching the same filters as get_by_organization."""
         query = select(func.count(self.model.id)).where(
-            and_(
-                self.model.organization_id == organization_id,
-                self.model.scope == "organization"
-            )
+            *self._organization_filters(organization_id, status, include_global)
         )
         
         result = await self.db.execute(query)
@@ -0,0 +1,92 @@
+"""Background queue for writing assessment audit entries off the request path."""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.database import async_session_maker
+from app.repositories.assessment import AssessmentAuditRepository
+
+
+logger = logging.getLogger(__name__)
+
+# A batch is written once it holds this many rows or has waited this long
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 0.05
+# Rows beyond this are dropped (and logged) rather than growing without bound
+AUDIT_QUEUE_MAX_SIZE = 10000
+
+
+class AuditQueue:
+    """Buffers audit log rows and inserts them in batches.
+
+    Entries are written from a background task on their own session, so they
+    are not part of the caller's transaction and can be lost if the process
+    dies before a flush. Audit entries that must commit atomically with the
+    change they describe should keep using ``AssessmentAuditRepository``.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def enqueue(self, **row) -> None:
+        """Queue an audit log entry, starting the writer task if needed."""
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAX_SIZE)
+            self._worker = asyncio.create_task(self._run())
+
+        # Keep the time of the event rather than the time of the write
+        row.setdefault("created_at", datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            logger.error(f"Audit queue full, dropping {row.get('action')} entry for {row.get('assessment_id')}")
+
+    async def close(self) -> None:
+        """Write any queued entries and stop the writer task."""
+        if self._worker is None or self._worker.done():
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._queue.get()
+            if row is None:
+                return
+
+            batch = [row]
+            stop = False
+            deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+            while len(batch) < AUDIT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+
+            await self._write(batch)
+            if stop:
+                return
+
+    async def _write(self, batch: List[Dict]) -> None:
+        try:
+            async with async_session_maker() as session:
+                await AssessmentAuditRepository(session).create_many(batch)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit entries: {str(e)}")
+
+
+audit_queue = AuditQueue()
@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import async_session_maker
 from app.repositories.document import ProcessedDocumentRepository
+from app.services.document_service import invalidate_document_stats
 from app.services.vector_service import VectorService
 
 
@@ -26,6 +27,9 @@ document_queue = Queue('document_processing', connection=redis_conn)
 generation_queue = Queue('document_generation', connection=redis_conn)
 recommendation_queue = Queue('recommendations', connection=redis_conn)
 
+# Uploads are refused while this many documents are waiting for processing
+MAX_PENDING_DOCUMENT_JOBS = 100
+
 
 class DocumentJobService:
     """Service for managing document processing jobs."""
@@ -102,8 +106,10 @@ class DocumentJobService:
             else:
                 update_data["processing_metadata"] = processing_metadata
         
-        await self.document_repo.update(document_id, **update_data)
+        document = await self.document_repo.update(document_id, **update_data)
         await self.db.commit()
+        if document:
+            await invalidate_document_stats(document.organization_id)
 
 
 def process_document_job(document_id: str) -> Dict[str, Any]:
@@ -220,6 +226,11 @@ async def _mark_document_failed(document_id: UUID, error: str):
         )
 
 
+def document_queue_is_full() -> bool:
+    """Whether the document processing backlog has reached its limit."""
+    return document_queue.count >= MAX_PENDING_DOCUMENT_JOBS
+
+
 def enqueue_document_processing(
     document_id: UUID,
     organization_id: Optional[UUID] = None,
@@ -339,6 +350,7 @@ async def _process_document_async_with_context(
                 }
             )
             await db.commit()
+            await invalidate_document_stats(organization_id)
             
             return result
             
@@ -9,12 +9,14 @@ import uuid
 from datetime import datetime, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.models.assessment import Assessment
 from app.models.assessment import AssessmentAnswer
 from app.models.reference import (
@@ -67,6 +69,11 @@ class SubmeasureCompliance:
     mandatory_controls: int
     mandatory_answered: int
     failed_controls: List[str]
+    score_f: Optional[float] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        # Serialized score, converted once instead of on every store
+        self.score_f = float(self.overall_score) if self.overall_score else None
 
 
 @dataclass
@@ -82,6 +89,11 @@ class MeasureCompliance:
     total_submeasures: int
     passed_submeasures: int
     critical_failures: List[str]
+    score_f: Optional[float] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        # Serialized score, converted once instead of on every store
+        self.score_f = float(self.overall_score) if self.overall_score else None
 
 
 @dataclass
@@ -101,6 +113,8 @@ class OverallCompliance:
     individual_threshold: Decimal
     average_threshold: Decimal
     calculated_at: datetime
+    total_controls: int = 0
+    answered_controls: int = 0
 
 
 class ComplianceScoringService:
@@ -476,6 +490,10 @@ class ComplianceScoringService:
         maturity_score = sum(mc.passed_submeasures for mc in measure_compliances)
         meets_maturity_trend = maturity_score >= maturity_threshold
 
+        # Control-submeasure combination counts, used in the stored detailed results
+        total_controls = sum(sc.total_controls for mc in measure_compliances for sc in mc.submeasures)
+        answered_controls = sum(sc.answered_controls for mc in measure_compliances for sc in mc.submeasures)
+
         return OverallCompliance(
             assessment_id=assessment_id,
             security_level=security_level,
@@ -490,7 +508,9 @@ class ComplianceScoringService:
             meets_maturity_trend=meets_maturity_trend,
             individual_threshold=thresholds["individual"],
             average_threshold=thresholds["average"],
-            calculated_at=datetime.now(timezone.utc)
+            calculated_at=datetime.now(timezone.utc),
+            total_controls=total_controls,
+            answered_controls=answered_controls
         )
 
     async def store_compliance_results(self, compliance: OverallCompliance) -> None:
@@ -545,7 +565,7 @@ class ComplianceScoringService:
             existing.mandatory_controls = compliance.mandatory_controls
             existing.mandatory_answered = compliance.mandatory_answered
             existing.failed_controls = compliance.failed_controls
-            existing.updated_at = datetime.now(timezone.utc)
+            existing.updated_at = func.now()
         else:
             # Create new
             new_score = SubmeasureScoreModel(
@@ -706,7 +726,7 @@ class ComplianceScoringService:
             existing.answered_controls = answered_controls
             existing.mandatory_controls = mandatory_controls
             existing.mandatory_answered = mandatory_answered
-            existing.updated_at = datetime.now(timezone.utc)
+            existing.updated_at = func.now()
         else:
             # Create new
             new_score = MeasureScoreModel(
@@ -727,92 +747,82 @@ class ComplianceScoringService:
             self.db.add(new_score)
 
     async def _store_compliance_score(self, compliance: OverallCompliance) -> None:
-        """Store or update overall compliance score."""
-        existing_query = select(ComplianceScoreModel).where(
-            ComplianceScoreModel.assessment_id == compliance.assessment_id
-        )
-        result = await self.db.execute(existing_query)
-        existing = result.scalar_one_or_none()
-
-        # Get accurate control counts from the assessment answer repository
-        # This already uses DISTINCT to avoid double-counting
-        from app.repositories.assessment_answer_repository import AssessmentAnswerRepository
-        answer_repo = AssessmentAnswerRepository(self.db)
-        control_stats = await answer_repo.get_completion_stats(compliance.assessment_id)
+        """
+        Store or update overall compliance score with a single upsert.
         
-        total_controls = control_stats["total_controls"]
-        answered_controls = control_stats["answered_controls"]
+        ``compliance.measures`` and their ``submeasures`` are the plain
+        dataclasses built by the scoring pass, so serializing them never
+        triggers lazy relationship loads.
+        """
+        # Control counts are accumulated during the scoring pass, so no extra
+        # query is needed here
+        total_controls = compliance.total_controls
+        answered_controls = compliance.answered_controls
+
+        if settings.DEBUG:
+            # Cross-check the in-memory counts against the repository in debug mode
+            from app.repositories.assessment_answer_repository import AssessmentAnswerRepository
+            answer_repo = AssessmentAnswerRepository(self.db)
+            control_stats = await answer_repo.get_completion_stats(compliance.assessment_id)
+            if (control_stats["total_controls"], control_stats["answered_controls"]) != (total_controls, answered_controls):
+                logger.warning(
+                    f"Control count mismatch for assessment {compliance.assessment_id}: "
+                    f"scored {total_controls}/{answered_controls}, "
+                    f"repository {control_stats['total_controls']}/{control_stats['answered_controls']}"
+                )
 
-        if existing:
-            # Update existing
-            existing.overall_compliance_score = compliance.overall_score
-            existing.compliance_percentage = compliance.compliance_percentage
-            existing.passes_compliance = compliance.passes_compliance
-            existing.total_measures = compliance.total_measures
-            existing.passed_measures = compliance.passed_measures
-            existing.maturity_score = compliance.maturity_score
-            existing.maturity_threshold = compliance.maturity_threshold
-            existing.meets_maturity_trend = compliance.meets_maturity_trend
-            existing.security_level = compliance.security_level
-            existing.individual_threshold = compliance.individual_threshold
-            existing.average_threshold = compliance.average_threshold
-            existing.detailed_results = {
-                "total_controls": total_controls,
-                "answered_controls": answered_controls,
-                "measures": [
-                    {
-                        "code": m.measure_code,
-                        "score": float(m.overall_score) if m.overall_score else None,
-                        "passes": m.passes_compliance,
-                        "submeasures": [
-                            {
-                                "code": s.submeasure_code,
-                                "score": float(s.overall_score) if s.overall_score else None,
-                                "passes": s.passes_overall,
-                                "failed_controls": s.failed_controls
-                            }
-                            for s in m.submeasures
-                        ]
-                    }
-                    for m in compliance.measures
-                ]
-            }
-            existing.updated_at = datetime.now(timezone.utc)
-        else:
-            # Create new
-            new_score = ComplianceScoreModel(
-                assessment_id=compliance.assessment_id,
-                overall_compliance_score=compliance.overall_score,
-                compliance_percentage=compliance.compliance_percentage,
-                passes_compliance=compliance.passes_compliance,
-                total_measures=compliance.total_measures,
-                passed_measures=compliance.passed_measures,
-                maturity_score=compliance.maturity_score,
-                maturity_threshold=compliance.maturity_threshold,
-                meets_maturity_trend=compliance.meets_maturity_trend,
-                security_level=compliance.security_level,
-                individual_threshold=compliance.individual_threshold,
-                average_threshold=compliance.average_threshold,
-                detailed_results={
-                    "total_controls": total_controls,
-                    "answered_controls": answered_controls,
-                    "measures": [
+        if settings.DEBUG:
+            assert all(isinstance(m, MeasureCompliance) for m in compliance.measures), \
+                "detailed_results must be built from scoring dataclasses, not ORM rows"
+
+        # Build the serialized measure tree once and reuse it for the upsert
+        detailed_results = {
+            "total_controls": total_controls,
+            "answered_controls": answered_controls,
+            "measures": [
+                {
+                    "code": m.measure_code,
+                    "score": m.score_f,
+                    "passes": m.passes_compliance,
+                    "submeasures": [
                         {
-                            "code": m.measure_code,
-                            "score": float(m.overall_score) if m.overall_score else None,
-                            "passes": m.passes_compliance,
-                            "submeasures": [
-                                {
-                                    "code": s.submeasure_code,
-                                    "score": float(s.overall_score) if s.overall_score else None,
-                                    "passes": s.passes_overall,
-                                    "failed_controls": s.failed_controls
-                                }
-                                for s in m.submeasures
-                            ]
+                            "code": s.submeasure_code,
+                            "score": s.score_f,
+                            "passes": s.passes_overall,
+                            "failed_controls": s.failed_controls
                         }
-                        for m in compliance.measures
+                        for s in m.submeasures
                     ]
                 }
-            )
-            self.db.add(new_score)
\ No newline at end of file
+                for m in compliance.measures
+            ]
+        }
+
+        payload = {
+            "assessment_id": compliance.assessment_id,
+            "overall_compliance_score": compliance.overall_score,
+            "compliance_percentage": compliance.compliance_percentage,
+            "passes_compliance": compliance.passes_compliance,
+            "total_measures": compliance.total_measures,
+            "passed_measures": compliance.passed_measures,
+            "maturity_score": compliance.maturity_score,
+            "maturity_threshold": compliance.maturity_threshold,
+            "meets_maturity_trend": compliance.meets_maturity_trend,
+            "security_level": compliance.security_level,
+            "individual_threshold": compliance.individual_threshold,
+            "average_threshold": compliance.average_threshold,
+            "detailed_results": detailed_results,
+        }
+
+        # INSERT ... ON CONFLICT DO UPDATE: one atomic round-trip instead of
+        # SELECT followed by UPDATE or INSERT
+        stmt = pg_insert(ComplianceScoreModel).values(**payload)
+        update_set = {
+            key: stmt.excluded[key] for key in payload if key != "assessment_id"
+        }
+        update_set["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_compliance_score_version",
+            set_=update_set
+        ).returning(ComplianceScoreModel.id)
+        await self.db.execute(stmt)
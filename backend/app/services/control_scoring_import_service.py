@@ -1,14 +1,15 @@
 """Service for importing control scoring requirements with submeasure context."""
-import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Set
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, and_, delete, func, text
 import uuid
 
+import ijson
+import orjson
+
 from app.models import (
     Control,
     ControlRequirement,
@@ -21,6 +22,45 @@ from app.models import (
 
 logger = logging.getLogger(__name__)
 
+# Files below this size are parsed in one go; larger ones are streamed
+STREAMING_THRESHOLD_BYTES = 1024 * 1024
+
+# Security levels
+SECURITY_LEVELS = ('osnovna', 'srednja', 'napredna')
+LEVELS_BY_NAME = {level: level for level in SECURITY_LEVELS}
+
+# Map A/B/C to threshold values
+# A = Required (threshold 3.0)
+# B = Partially required (threshold 2.0)
+# C = Not required (no threshold)
+THRESHOLD_MAP = {
+    'A': 3.0,
+    'B': 2.0,
+    'C': None
+}
+
+
+def _iter_json_items(file_path: Path, prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """Yield key/value pairs of the JSON object at ``prefix`` (dot-separated path)."""
+    if file_path.stat().st_size < STREAMING_THRESHOLD_BYTES:
+        document = orjson.loads(file_path.read_bytes())
+        for key in prefix.split(".") if prefix else []:
+            document = document.get(key) or {}
+        yield from document.items()
+        return
+    
+    with open(file_path, 'rb') as f:
+        yield from ijson.kvitems(f, prefix, use_float=True)
+
+
+def _read_json_value(file_path: Path, prefix: str, default: Any = None) -> Any:
+    """Read a single top-level JSON value without loading the whole document."""
+    if file_path.stat().st_size < STREAMING_THRESHOLD_BYTES:
+        return orjson.loads(file_path.read_bytes()).get(prefix, default)
+    
+    with open(file_path, 'rb') as f:
+        return next(ijson.items(f, prefix, use_float=True), default)
+
 
 class ControlScoringImportService:
     """Import control scoring requirements with submeasure-specific context."""
@@ -37,38 +77,51 @@ class ControlScoringImportService:
             "errors": [],
             "warnings": []
         }
+        # Lookup maps shared by all import phases, populated by import_all_data
+        self._controls_by_code: Dict[str, Control] = {}
+        self._submeasures_by_code: Dict[str, Submeasure] = {}
     
     async def import_all_data(self, data_dir: str) -> Dict:
-        """Import all control scoring data with submeasure context."""
+        """
+        Import all control scoring data with submeasure context.
+        
+        The phases run one after another in the import's single
+        transaction, so the import is committed or rolled back as a whole.
+        """
         data_path = Path(data_dir)
+        phases: List[Tuple[str, Path]] = []
         
         try:
+            await self._load_lookup_maps()
+            
             # 1. Import control minimum scores with submeasure context
             context_file = data_path / "prilog_b_context_aware.json"
             if context_file.exists():
-                await self._import_control_scores_with_context(context_file)
+                phases.append(("_import_control_scores_with_context", context_file))
             else:
                 # Fallback to old format
                 prilog_b_file = data_path / "prilog_b_parsed.json"
                 if prilog_b_file.exists():
-                    await self._import_control_scores_legacy(prilog_b_file)
+                    phases.append(("_import_control_scores_legacy", prilog_b_file))
                 else:
                     self.stats["errors"].append(f"No Prilog B data found")
             
             # 2. Import control rating guidance
             prilog_c_file = data_path / "prilog_c_parsed.json"
             if prilog_c_file.exists():
-                await self._import_rating_guidance(prilog_c_file)
+                phases.append(("_import_rating_guidance", prilog_c_file))
             else:
                 self.stats["errors"].append(f"Prilog C file not found: {prilog_c_file}")
             
             # 3. Import submeasure requirements (A/B/C)
             submeasure_req_file = data_path / "submeasure_requirements_lookup.json"
             if submeasure_req_file.exists():
-                await self._import_submeasure_requirements(submeasure_req_file)
+                phases.append(("_import_submeasure_requirements", submeasure_req_file))
             else:
                 self.stats["errors"].append(f"Submeasure requirements file not found: {submeasure_req_file}")
             
+            await self._run_phases(phases)
+            
             # Commit all changes
             await self.session.commit()
             
@@ -81,32 +134,37 @@ class ControlScoringImportService:
             self.stats["errors"].append(f"Import failed: {str(e)}")
             raise
     
-    async def _import_control_scores_with_context(self, file_path: Path) -> None:
-        """Import control minimum scores with submeasure context."""
-        logger.info(f"Importing control scores with submeasure context from {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get all controls from database
+    async def _run_phases(self, phases: List[Tuple[str, Path]]) -> None:
+        """Run import phases in order on the import's session."""
+        for phase, file_path in phases:
+            await getattr(self, phase)(file_path)
+    
+    async def _load_lookup_maps(self) -> None:
+        """Load controls and submeasures once for all import phases."""
         controls_result = await self.session.execute(select(Control))
-        controls_by_code = {c.code: c for c in controls_result.scalars().all()}
+        self._controls_by_code = {c.code: c for c in controls_result.scalars().all()}
         
-        # Get all submeasures
         submeasures_result = await self.session.execute(select(Submeasure))
-        submeasures_by_number = {s.code: s for s in submeasures_result.scalars().all()}
+        self._submeasures_by_code = {s.code: s for s in submeasures_result.scalars().all()}
+    
+    async def _import_control_scores_with_context(self, file_path: Path) -> None:
+        """Import control minimum scores with submeasure context."""
+        logger.info(f"Importing control scores with submeasure context from {file_path}")
         
-        # Define security levels
-        security_levels = ['osnovna', 'srednja', 'napredna']
-        levels_by_name = {level: level for level in security_levels}
+        controls_by_code = self._controls_by_code
+        submeasures_by_number = self._submeasures_by_code
         
-        # Track which control-submeasure mappings we've created
-        created_mappings = set()
+        # Seed the known control-submeasure mappings from the database so
+        # neither cross-run nor within-run duplicates need a lookup
+        existing_mappings = await self.session.execute(
+            select(ControlSubmeasureMapping.control_id, ControlSubmeasureMapping.submeasure_id)
+        )
+        created_mappings = {(row.control_id, row.submeasure_id) for row in existing_mappings.all()}
         
-        # Process control-submeasure scores
-        control_submeasure_scores = data.get("control_submeasure_scores", {})
+        # Process control-submeasure scores, streamed from the file
+        control_submeasure_scores = _iter_json_items(file_path, "control_submeasure_scores")
         
-        for control_code, submeasure_scores in control_submeasure_scores.items():
+        for control_code, submeasure_scores in control_submeasure_scores:
             if control_code not in controls_by_code:
                 self.stats["errors"].append(f"Control {control_code} not found in database")
                 continue
@@ -125,24 +183,12 @@ class ControlScoringImportService:
                 # Create control-submeasure mapping if not exists
                 mapping_key = (control.id, submeasure.id)
                 if mapping_key not in created_mappings:
-                    # Check if mapping already exists
-                    existing_mapping = await self.session.execute(
-                        select(ControlSubmeasureMapping).where(
-                            and_(
-                                ControlSubmeasureMapping.control_id == control.id,
-                                ControlSubmeasureMapping.submeasure_id == submeasure.id
-                            )
-                        )
+                    mapping = ControlSubmeasureMapping(
+                        control_id=control.id,
+                        submeasure_id=submeasure.id
                     )
-                    
-                    if not existing_mapping.scalar_one_or_none():
-                        mapping = ControlSubmeasureMapping(
-                            control_id=control.id,
-                            submeasure_id=submeasure.id
-                        )
-                        self.session.add(mapping)
-                        self.stats["control_submeasure_mappings_created"] += 1
-                    
+                    self.session.add(mapping)
+                    self.stats["control_submeasure_mappings_created"] += 1
                     created_mappings.add(mapping_key)
                 
                 # Process each security level
@@ -150,7 +196,7 @@ class ControlScoringImportService:
                     if level_name in ["page", "table"]:  # Skip metadata
                         continue
                     
-                    level = levels_by_name.get(level_name.lower())
+                    level = LEVELS_BY_NAME.get(level_name.lower())
                     if not level:
                         self.stats["warnings"].append(f"Security level {level_name} not found")
                         continue
@@ -168,11 +214,14 @@ class ControlScoringImportService:
                     requirement = existing.scalar_one_or_none()
                     
                     if requirement:
-                        # Update existing
-                        requirement.minimum_score = score_value
-                        requirement.is_required = score_value is not None
-                        requirement.is_applicable = score_value is not None
-                        self.stats["requirements_updated"] += 1
+                        # Update existing only when something changed, so
+                        # re-imports of identical data don't emit UPDATEs
+                        if (requirement.minimum_score != score_value
+                                or requirement.is_applicable != (score_value is not None)):
+                            requirement.minimum_score = score_value
+                            requirement.is_required = score_value is not None
+                            requirement.is_applicable = score_value is not None
+                            self.stats["requirements_updated"] += 1
                     else:
                         # Create new
                         requirement = ControlRequirement(
@@ -190,19 +239,10 @@ class ControlScoringImportService:
         """Import control minimum scores without submeasure context (legacy format)."""
         logger.info(f"Importing control scores from legacy format {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get all controls from database
-        controls_result = await self.session.execute(select(Control))
-        controls_by_code = {c.code: c for c in controls_result.scalars().all()}
-        
-        # Define security levels
-        security_levels = ['osnovna', 'srednja', 'napredna']
-        levels_by_name = {level: level for level in security_levels}
+        controls_by_code = self._controls_by_code
         
         # Process each control's scores
-        for control_code, scores in data.get("controls", {}).items():
+        for control_code, scores in _iter_json_items(file_path, "controls"):
             if control_code not in controls_by_code:
                 self.stats["errors"].append(f"Control {control_code} not found in database")
                 continue
@@ -215,7 +255,7 @@ class ControlScoringImportService:
                 if level_name == "page":  # Skip metadata
                     continue
                 
-                level = levels_by_name.get(level_name.lower())
+                level = LEVELS_BY_NAME.get(level_name.lower())
                 if not level:
                     self.stats["errors"].append(f"Security level {level_name} not found")
                     continue
@@ -233,11 +273,13 @@ class ControlScoringImportService:
                 requirement = existing.scalar_one_or_none()
                 
                 if requirement:
-                    # Update existing
-                    requirement.minimum_score = score_value
-                    requirement.is_required = score_value is not None
-                    requirement.is_applicable = score_value is not None
-                    self.stats["requirements_updated"] += 1
+                    # Update existing only when something changed
+                    if (requirement.minimum_score != score_value
+                            or requirement.is_applicable != (score_value is not None)):
+                        requirement.minimum_score = score_value
+                        requirement.is_required = score_value is not None
+                        requirement.is_applicable = score_value is not None
+                        self.stats["requirements_updated"] += 1
                 else:
                     # Create new
                     requirement = ControlRequirement(
@@ -255,64 +297,101 @@ class ControlScoringImportService:
         """Import control rating guidance from Prilog C."""
         logger.info(f"Importing rating guidance from {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get all controls
-        controls_result = await self.session.execute(select(Control))
-        controls_by_code = {c.code: c for c in controls_result.scalars().all()}
+        controls_by_code = self._controls_by_code
         
         # Import general criteria (applies to all controls)
-        general_criteria = data.get("general_criteria", [])
+        general_criteria = _read_json_value(file_path, "general_criteria", [])
         if general_criteria:
             await self._import_general_rating_criteria(general_criteria, controls_by_code)
         
+        # Prefetch all guidance (including rows just inserted above) once,
+        # instead of one SELECT per control and criterion
+        guidance_result = await self.session.execute(select(ControlRatingGuidance))
+        guidance_by_key = {
+            (guidance.control_id, guidance.score): guidance
+            for guidance in guidance_result.scalars().all()
+        }
+        
         # Import control-specific criteria if available
-        control_specific = data.get("control_specific_criteria", {})
-        for control_code, criteria in control_specific.items():
+        control_specific = _iter_json_items(file_path, "control_specific_criteria")
+        for control_code, criteria in control_specific:
             if control_code not in controls_by_code:
                 self.stats["warnings"].append(f"Control {control_code} not found for rating guidance")
                 continue
             
             control = controls_by_code[control_code]
-            await self._import_control_specific_criteria(control, criteria)
+            self._import_control_specific_criteria(control, criteria, guidance_by_key)
     
     async def _import_general_rating_criteria(self, criteria: List[Dict], controls_by_code: Dict) -> None:
         """Import general rating criteria for all controls."""
         logger.info("Importing general rating criteria")
         
+        # Prefetch existing (control_id, score) pairs so the fan-out below
+        # needs no per-row existence check
+        existing_result = await self.session.execute(
+            select(ControlRatingGuidance.control_id, ControlRatingGuidance.score)
+        )
+        existing_guidance = {(row.control_id, row.score) for row in existing_result.all()}
+        
         # Apply general criteria to all controls
-        for control_code, control in controls_by_code.items():
+        rows: List[Tuple] = []
+        for control in controls_by_code.values():
             for criterion in criteria:
                 score = criterion.get("score")
-                doc_criteria = criterion.get("documentation_criteria", "")
-                impl_criteria = criterion.get("implementation_criteria", "")
-                
-                if not score:
+                if not score or (control.id, score) in existing_guidance:
                     continue
                 
-                # Check if guidance already exists
-                existing = await self.session.execute(
-                    select(ControlRatingGuidance).where(
-                        and_(
-                            ControlRatingGuidance.control_id == control.id,
-                            ControlRatingGuidance.score == score
-                        )
-                    )
-                )
-                
-                if not existing.scalar_one_or_none():
-                    guidance = ControlRatingGuidance(
-                        control_id=control.id,
-                        score=score,
-                        documentation_criteria=doc_criteria,
-                        implementation_criteria=impl_criteria
-                    )
-                    self.session.add(guidance)
-                    self.stats["rating_guidance_created"] += 1
+                rows.append((
+                    uuid.uuid4(),
+                    control.id,
+                    score,
+                    criterion.get("documentation_criteria", ""),
+                    criterion.get("implementation_criteria", "")
+                ))
+                existing_guidance.add((control.id, score))
+        
+        if not rows:
+            return
+        
+        await self._bulk_insert_rating_guidance(rows)
+        self.stats["rating_guidance_created"] += len(rows)
     
-    async def _import_control_specific_criteria(self, control: Control, criteria: List[Dict]) -> None:
-        """Import control-specific rating criteria."""
+    async def _bulk_insert_rating_guidance(self, rows: List[Tuple]) -> None:
+        """Bulk insert rating guidance rows, using COPY when running on asyncpg."""
+        columns = ["id", "control_id", "score", "documentation_criteria", "implementation_criteria"]
+        
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        
+        if hasattr(driver_connection, "copy_records_to_table"):
+            await driver_connection.copy_records_to_table(
+                ControlRatingGuidance.__tablename__,
+                records=rows,
+                columns=columns
+            )
+        else:
+            # Non-asyncpg driver: ship all rows as one JSONB array and let
+            # Postgres expand it, so the insert is a single statement
+            table = ControlRatingGuidance.__tablename__
+            column_list = ", ".join(columns)
+            payload = orjson.dumps([dict(zip(columns, row)) for row in rows]).decode()
+            await self.session.execute(
+                text(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM jsonb_populate_recordset(NULL::{table}, CAST(:payload AS jsonb)) "
+                    f"ON CONFLICT DO NOTHING"
+                ),
+                {"payload": payload}
+            )
+    
+    def _import_control_specific_criteria(
+        self,
+        control: Control,
+        criteria: List[Dict],
+        guidance_by_key: Dict[Tuple, ControlRatingGuidance]
+    ) -> None:
+        """Import control-specific rating criteria against prefetched guidance."""
         for criterion in criteria:
             score = criterion.get("score")
             doc_criteria = criterion.get("documentation_criteria", "")
@@ -321,21 +400,13 @@ class ControlScoringImportService:
             if not score:
                 continue
             
-            # Check if guidance already exists
-            existing = await self.session.execute(
-                select(ControlRatingGuidance).where(
-                    and_(
-                        ControlRatingGuidance.control_id == control.id,
-                        ControlRatingGuidance.score == score
-                    )
-                )
-            )
-            
-            guidance = existing.scalar_one_or_none()
+            guidance = guidance_by_key.get((control.id, score))
             if guidance:
-                # Update existing with control-specific criteria
-                guidance.documentation_criteria = doc_criteria
-                guidance.implementation_criteria = impl_criteria
+                # Update existing with control-specific criteria if they differ
+                if (guidance.documentation_criteria != doc_criteria
+                        or guidance.implementation_criteria != impl_criteria):
+                    guidance.documentation_criteria = doc_criteria
+                    guidance.implementation_criteria = impl_criteria
             else:
                 # Create new
                 guidance = ControlRatingGuidance(
@@ -345,25 +416,17 @@ class ControlScoringImportService:
                     implementation_criteria=impl_criteria
                 )
                 self.session.add(guidance)
+                guidance_by_key[(control.id, score)] = guidance
                 self.stats["rating_guidance_created"] += 1
     
     async def _import_submeasure_requirements(self, file_path: Path) -> None:
         """Import submeasure requirements (A/B/C values)."""
         logger.info(f"Importing submeasure requirements from {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get all submeasures
-        submeasures_result = await self.session.execute(select(Submeasure))
-        submeasures_by_number = {s.code: s for s in submeasures_result.scalars().all()}
-        
-        # Define security levels
-        security_levels = ['osnovna', 'srednja', 'napredna']
-        levels_by_name = {level: level for level in security_levels}
+        submeasures_by_number = self._submeasures_by_code
         
         # Process each submeasure
-        for submeasure_num, requirements in data.items():
+        for submeasure_num, requirements in _iter_json_items(file_path):
             submeasure = submeasures_by_number.get(submeasure_num)
             if not submeasure:
                 self.stats["warnings"].append(f"Submeasure {submeasure_num} not found in database")
@@ -371,21 +434,11 @@ class ControlScoringImportService:
             
             # Process each security level
             for level_name, requirement_value in requirements.items():
-                level = levels_by_name.get(level_name.lower())
+                level = LEVELS_BY_NAME.get(level_name.lower())
                 if not level:
                     continue
                 
-                # Map A/B/C to threshold values
-                # A = Required (threshold 3.0)
-                # B = Partially required (threshold 2.0)  
-                # C = Not required (no threshold)
-                threshold_map = {
-                    'A': 3.0,
-                    'B': 2.0,
-                    'C': None
-                }
-                
-                individual_threshold = threshold_map.get(requirement_value)
+                individual_threshold = THRESHOLD_MAP.get(requirement_value)
                 
                 # Check if threshold already exists
                 existing = await self.session.execute(
@@ -399,9 +452,11 @@ class ControlScoringImportService:
                 
                 threshold = existing.scalar_one_or_none()
                 if threshold:
-                    # Update existing
-                    threshold.individual_threshold = individual_threshold
-                    threshold.average_threshold = individual_threshold  # Same for now
+                    # Update existing only when the threshold changed
+                    if (threshold.individual_threshold != individual_threshold
+                            or threshold.average_threshold != individual_threshold):
+                        threshold.individual_threshold = individual_threshold
+                        threshold.average_threshold = individual_threshold  # Same for now
                 else:
                     # Create new
                     if individual_threshold is not None:  # Only create if not C
@@ -429,61 +484,50 @@ class ControlScoringImportService:
             "issues": []
         }
         
-        # Check control requirements
-        result = await self.session.execute(
-            select(ControlRequirement).options(
-                selectinload(ControlRequirement.control),
-                selectinload(ControlRequirement.security_level),
-                selectinload(ControlRequirement.submeasure)
+        # Check control requirements (aggregated in the database)
+        by_level_result = await self.session.execute(
+            select(ControlRequirement.level, func.count())
+            .group_by(ControlRequirement.level)
+        )
+        by_level = {level_name: count for level_name, count in by_level_result.all()}
+        validation_results["control_requirements"]["by_level"] = by_level
+        validation_results["control_requirements"]["total"] = sum(by_level.values())
+        
+        # Count with/without submeasure in one pass
+        submeasure_counts = await self.session.execute(
+            select(
+                func.count(ControlRequirement.submeasure_id),
+                func.count().filter(ControlRequirement.submeasure_id.is_(None))
             )
         )
-        requirements = result.scalars().all()
-        
-        validation_results["control_requirements"]["total"] = len(requirements)
-        
-        # Analyze requirements
-        for req in requirements:
-            level_name = req.security_level.name
-            
-            # Count by level
-            if level_name not in validation_results["control_requirements"]["by_level"]:
-                validation_results["control_requirements"]["by_level"][level_name] = 0
-            validation_results["control_requirements"]["by_level"][level_name] += 1
-            
-            # Count with/without submeasure
-            if req.submeasure_id:
-                validation_results["control_requirements"]["with_submeasure"] += 1
-            else:
-                validation_results["control_requirements"]["without_submeasure"] += 1
+        with_submeasure, without_submeasure = submeasure_counts.one()
+        validation_results["control_requirements"]["with_submeasure"] = with_submeasure
+        validation_results["control_requirements"]["without_submeasure"] = without_submeasure
         
         # Check control-submeasure mappings
-        mappings_result = await self.session.execute(select(ControlSubmeasureMapping))
-        validation_results["control_submeasure_mappings"] = len(mappings_result.scalars().all())
+        validation_results["control_submeasure_mappings"] = await self.session.scalar(
+            select(func.count()).select_from(ControlSubmeasureMapping)
+        )
         
         # Check rating guidance
-        guidance_result = await self.session.execute(
-            select(ControlRatingGuidance.control_id).distinct()
+        controls_with_guidance = await self.session.scalar(
+            select(func.count(func.distinct(ControlRatingGuidance.control_id)))
         )
-        controls_with_guidance = len(guidance_result.all())
         validation_results["rating_guidance"]["controls_with_guidance"] = controls_with_guidance
         
         # Check submeasure thresholds
         thresholds_result = await self.session.execute(
-            select(SubmeasureThreshold).options(
-                selectinload(SubmeasureThreshold.security_level)
-            )
+            select(SubmeasureThreshold.security_level, func.count())
+            .group_by(SubmeasureThreshold.security_level)
         )
-        thresholds = thresholds_result.scalars().all()
-        
-        for threshold in thresholds:
-            level_name = threshold.security_level.name
-            if level_name not in validation_results["submeasure_thresholds"]:
-                validation_results["submeasure_thresholds"][level_name] = 0
-            validation_results["submeasure_thresholds"][level_name] += 1
+        validation_results["submeasure_thresholds"] = {
+            level_name: count for level_name, count in thresholds_result.all()
+        }
         
         # Check for potential issues
-        all_controls = await self.session.execute(select(Control))
-        total_controls = len(all_controls.scalars().all())
+        total_controls = await self.session.scalar(
+            select(func.count()).select_from(Control)
+        )
         
         if controls_with_guidance < total_controls:
             validation_results["issues"].append(
@@ -491,10 +535,9 @@ class ControlScoringImportService:
             )
         
         # Check for controls without any requirements
-        controls_with_reqs = await self.session.execute(
-            select(ControlRequirement.control_id).distinct()
+        controls_with_reqs_count = await self.session.scalar(
+            select(func.count(func.distinct(ControlRequirement.control_id)))
         )
-        controls_with_reqs_count = len(controls_with_reqs.all())
         
         if controls_with_reqs_count < total_controls:
             validation_results["issues"].append(
@@ -503,15 +546,32 @@ class ControlScoringImportService:
         
         return validation_results
     
-    async def clear_existing_data(self) -> None:
-        """Clear existing scoring data before import."""
+    async def clear_existing_data(self, truncate: bool = False) -> None:
+        """
+        Clear existing scoring data before import.
+        
+        With ``truncate=True`` the tables are wiped with a single TRUNCATE
+        instead of row-by-row DELETEs. Only the import CLI should use it, as
+        TRUNCATE takes an ACCESS EXCLUSIVE lock on all four tables.
+        """
         logger.warning("Clearing existing scoring data")
         
-        # Delete in order to respect foreign key constraints
-        await self.session.execute(delete(ControlRatingGuidance))
-        await self.session.execute(delete(ControlRequirement))
-        await self.session.execute(delete(ControlSubmeasureMapping))
-        await self.session.execute(delete(SubmeasureThreshold))
+        if truncate:
+            tables = ", ".join(
+                model.__tablename__ for model in (
+                    ControlRatingGuidance,
+                    ControlRequirement,
+                    ControlSubmeasureMapping,
+                    SubmeasureThreshold
+                )
+            )
+            await self.session.execute(text(f"TRUNCATE TABLE {tables} RESTART IDENTITY"))
+        else:
+            # Delete in order to respect foreign key constraints
+            await self.session.execute(delete(ControlRatingGuidance))
+            await self.session.execute(delete(ControlRequirement))
+            await self.session.execute(delete(ControlSubmeasureMapping))
+            await self.session.execute(delete(SubmeasureThreshold))
         
         await self.session.commit()
         logger.info("Existing scoring data cleared")
@@ -522,6 +582,6 @@ async def run_import(session: AsyncSession, data_dir: str, clear_existing: bool
     service = ControlScoringImportServiceV2(session)
     
     if clear_existing:
-        await service.clear_existing_data()
+        await service.clear_existing_data(truncate=True)
     
     return await service.import_all_data(data_dir)
\ No newline at end of file
@@ -1,6 +1,12 @@
 """Page-aware document chunking with metadata extraction for two-layer RAG."""
+import functools
+import gc
+import json
 import re
-from typing import List, Dict, Any, Optional
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Union
 from dataclasses import dataclass
 from langchain.schema import Document
 import logging
@@ -37,36 +43,87 @@ class ChunkMetadata:
     chunk_index: int = 0
 
 
+@functools.cache
+def _parquet_chunk_schema():
+    """Build the Parquet schema for chunk output once per process."""
+    import pyarrow as pa
+    
+    return pa.schema([
+        ('content', pa.string()),
+        ('page_start', pa.int64()),
+        ('page_end', pa.int64()),
+        ('page_anchor', pa.int64()),
+        ('control_ids', pa.list_(pa.string())),
+        ('doc_type', pa.string()),
+        ('section_title', pa.string()),
+        ('chunk_metadata', pa.string()),
+    ])
+
+
 class PageAwareChunker:
     """Chunks documents preserving page boundaries with metadata extraction."""
     
     # Control ID pattern - matches XXX-NNN or XXXX-NNN format
     CONTROL_PATTERN = re.compile(r'\b[A-Z]{3,4}-\d{3}\b')
+    # Same pattern over UTF-8 bytes for the page-level sweep; bytes \b treats
+    # every non-ASCII byte as a boundary, so non-ASCII neighbours are rechecked
+    CONTROL_PATTERN_BYTES = re.compile(rb'\b[A-Z]{3,4}-\d{3}\b')
     
-    # Section title patterns
-    SECTION_PATTERNS = [
-        re.compile(r'^(?:\d+\.)+\s+(.+)$'),  # Numbered sections (1.2.3 Title)
-        re.compile(r'^[A-Z][A-Z\s]{2,50}$'),  # All caps headers
-        re.compile(r'^(?:Članak|Article|Section)\s+\d+'),  # Legal sections
-        re.compile(r'^(?:Mjera|Measure)\s+\d+'),  # Measure sections
-    ]
+    # Header/footer lines, fused into one alternation so each line is scanned once:
+    # page numbers (Page 1 of 10, Stranica 1 od 10, - 1 -), date stamps,
+    # document identifiers and copyright lines
+    HEADER_FOOTER_PATTERN = re.compile(
+        r'^(?:'
+        r'(?:Page\s+)?\d+(?:\s+of\s+\d+)?$'
+        r'|(?:Stranica\s+)?\d+(?:\s+od\s+\d+)?$'
+        r'|-\s*\d+\s*-$'
+        r'|\d{1,2}[./]\d{1,2}[./]\d{2,4}'
+        r'|(?:Doc|Document|ID)[:\s]+[\w-]+$'
+        r'|.{0,10}(?:copyright|©|\(c\))'
+        r')',
+        re.IGNORECASE
+    )
     
-    # Document type detection patterns - aligned with existing source field
+    # Section header patterns, fused so each line is tested once; alternation
+    # order preserves the previous priority (numbered, caps, legal, measure)
+    SECTION_PATTERN = re.compile(
+        r'^(?:'
+        r'(?P<numbered>(?:\d+\.)+\s+(?P<title>.+))'  # Numbered sections (1.2.3 Title)
+        r'|(?P<caps>[A-Z][A-Z\s]{2,50})'  # All caps headers
+        r'|(?P<legal>(?:Članak|Article|Section)\s+\d+.*)'  # Legal sections
+        r'|(?P<measure>(?:Mjera|Measure)\s+\d+.*)'  # Measure sections
+        r')$'
+    )
+    
+    # Document type detection patterns - aligned with existing source field.
+    # Patterns are lowercase and case-sensitive; the sample is lowered once so
+    # sre can use its literal-prefix search instead of IGNORECASE matching.
     DOC_TYPE_PATTERNS = {
-        'ZKS': re.compile(r'(?i)(zakon.*kibern|zks|cyber.*security.*act)'),
-        'NIS2': re.compile(r'(?i)(nis\s*2|network.*information.*security|direktiva.*nis)'),
-        'UKS': re.compile(r'(?i)(uredba.*kibern|uks|regulation.*cyber)'),
-        'PRILOG_B': re.compile(r'(?i)(prilog\s*b|appendix\s*b|annex\s*b)'),
-        'PRILOG_C': re.compile(r'(?i)(prilog\s*c|appendix\s*c|annex\s*c)'),
-        'ISO': re.compile(r'(?i)(iso\s*27\d{3}|iso/iec)'),
-        'NIST': re.compile(r'(?i)(nist\s*(csf|framework|sp\s*800))'),
+        'ZKS': re.compile(r'(zakon.*kibern|zks|cyber.*security.*act)'),
+        'NIS2': re.compile(r'(nis\s*2|network.*information.*security|direktiva.*nis)'),
+        'UKS': re.compile(r'(uredba.*kibern|uks|regulation.*cyber)'),
+        'PRILOG_B': re.compile(r'(prilog\s*b|appendix\s*b|annex\s*b)'),
+        'PRILOG_C': re.compile(r'(prilog\s*c|appendix\s*c|annex\s*c)'),
+        'ISO': re.compile(r'(iso\s*27\d{3}|iso/iec)'),
+        'NIST': re.compile(r'(nist\s*(csf|framework|sp\s*800))'),
     }
     
+    # Generic document type fallbacks
+    GENERIC_STANDARD_PATTERN = re.compile(r'(standard|iso|cobit|itil)')
+    GENERIC_REGULATION_PATTERN = re.compile(r'(regulation|directive|zakon|uredba)')
+    
+    # Whitespace normalization and sentence splitting
+    MULTI_NEWLINE_PATTERN = re.compile(r'\n{3,}')
+    MULTI_SPACE_PATTERN = re.compile(r'[ \t]+')
+    SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
+    
     def __init__(
         self,
         max_chunk_size: int = 800,
         min_chunk_size: int = 200,
         header_footer_lines: int = 2,
+        emit_parents: bool = False,
+        extract_section_titles: bool = True,
     ):
         """
         Initialize the page-aware chunker.
@@ -75,10 +132,16 @@ class PageAwareChunker:
             max_chunk_size: Maximum size of a chunk in characters
             min_chunk_size: Minimum size of a chunk (avoid tiny fragments)
             header_footer_lines: Number of lines to check for headers/footers
+            emit_parents: Also emit the full page as a parent record when a
+                page is split, for small-to-big retrieval
+            extract_section_titles: Detect section titles; callers that do not
+                store section_title can turn this off to skip the per-page scan
         """
         self.max_chunk_size = max_chunk_size
         self.min_chunk_size = min_chunk_size
         self.header_footer_lines = header_footer_lines
+        self.emit_parents = emit_parents
+        self.extract_section_titles = extract_section_titles
     
     def process_document(
         self,
@@ -97,11 +160,28 @@ class PageAwareChunker:
         Returns:
             List of chunk dictionaries ready for database insertion
         """
+        return list(self.iter_chunks(documents, filename, force_doc_type))
+    
+    def iter_chunks(
+        self,
+        documents: List[Document],
+        filename: str = "",
+        force_doc_type: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield page-aware chunks with metadata.
+        
+        Only the previous chunk is held back, so spillover connections can be
+        resolved without keeping the whole document's chunks in memory.
+        """
         # Detect document type once for entire document
         doc_type = force_doc_type or self._detect_doc_type(documents, filename)
         logger.info(f"Processing document with type: {doc_type}")
         
-        processed_chunks = []
+        prev_chunk: Optional[Dict[str, Any]] = None
+        # Parent records skip spillover linking; they wait here until the
+        # held-back chunk from the previous page has been yielded
+        pending_parents: List[Dict[str, Any]] = []
         
         for doc_idx, doc in enumerate(documents):
             page_num = doc.metadata.get('page', doc_idx)
@@ -109,12 +189,15 @@ class PageAwareChunker:
             # Clean and normalize page content
             clean_content = self._clean_page_content(doc.page_content)
             
-            if not clean_content.strip():
-                continue  # Skip empty pages
+            if not clean_content:
+                continue  # Skip empty pages (content is already stripped)
             
             # Extract page-level metadata
             page_control_ids = self._extract_control_ids(clean_content)
-            section_title = self._extract_section_title(clean_content, page_num)
+            section_title = (
+                self._extract_section_title(clean_content, page_num)
+                if self.extract_section_titles else None
+            )
             
             # Check for spillover indicators
             has_spillover = self._detect_spillover(clean_content)
@@ -134,12 +217,107 @@ class PageAwareChunker:
                 )
             )
             
-            processed_chunks.extend(page_chunks)
+            for chunk in page_chunks:
+                if chunk['chunk_metadata'].get('is_parent'):
+                    if prev_chunk is None:
+                        yield chunk
+                    else:
+                        pending_parents.append(chunk)
+                    continue
+                if prev_chunk is not None:
+                    self._connect_spillover_pair(prev_chunk, chunk)
+                    yield prev_chunk
+                    if pending_parents:
+                        yield from pending_parents
+                        pending_parents.clear()
+                prev_chunk = chunk
+        
+        if prev_chunk is not None:
+            yield prev_chunk
+    
+    def process_document_to_parquet(
+        self,
+        documents: List[Document],
+        out_path: Union[str, Path],
+        filename: str = "",
+        force_doc_type: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Stream chunks of a document into a Parquet file in bounded batches.
+        
+        ``chunk_metadata`` is stored as a JSON string so the schema stays
+        stable across batches.
+        
+        Returns:
+            Number of chunks written
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        schema = _parquet_chunk_schema()
+        
+        written = 0
+        batch: List[Dict[str, Any]] = []
+        
+        def flush() -> None:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch.clear()
+            gc.collect()
+        
+        with pq.ParquetWriter(str(out_path), schema) as writer:
+            for chunk in self.iter_chunks(documents, filename, force_doc_type):
+                batch.append({**chunk, 'chunk_metadata': json.dumps(chunk['chunk_metadata'])})
+                written += 1
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+        
+        return written
+    
+    def batch_process(
+        self,
+        docs_per_file: List[List[Document]],
+        filenames: List[str],
+        max_workers: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Process several documents in parallel across worker processes.
+        
+        Each document is chunked independently with ``process_document``. A
+        document that fails to process yields an empty chunk list instead of
+        aborting the whole batch.
+        
+        Args:
+            docs_per_file: Pages (Document objects) for each file
+            filenames: Original filename for each entry in docs_per_file
+            max_workers: Number of worker processes (defaults to CPU count)
+            
+        Returns:
+            List of chunk lists, in the same order as docs_per_file
+        """
+        if len(docs_per_file) != len(filenames):
+            raise ValueError("docs_per_file and filenames must have the same length")
         
-        # Post-process for spillover connections
-        self._connect_spillovers(processed_chunks)
+        results: List[List[Dict[str, Any]]] = []
+        total = len(filenames)
         
-        return processed_chunks
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.process_document, documents, filename)
+                for documents, filename in zip(docs_per_file, filenames)
+            ]
+            
+            for idx, (future, filename) in enumerate(zip(futures, filenames), start=1):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Failed to chunk document {filename}: {str(e)}")
+                    results.append([])
+                logger.info(f"Chunked {idx}/{total} documents")
+        
+        return results
     
     def _detect_doc_type(self, documents: List[Document], filename: str) -> str:
         """
@@ -151,6 +329,7 @@ class PageAwareChunker:
         sample = filename.lower() + " "
         if documents:
             sample += " ".join(d.page_content[:500] for d in documents[:min(3, len(documents))])
+        sample = sample.lower()
         
         # Check against known patterns
         for doc_type, pattern in self.DOC_TYPE_PATTERNS.items():
@@ -158,25 +337,28 @@ class PageAwareChunker:
                 return DOCUMENT_SOURCES[doc_type]
         
         # Check for generic types
-        if re.search(r'(?i)(standard|iso|cobit|itil)', sample):
+        if self.GENERIC_STANDARD_PATTERN.search(sample):
             return DOCUMENT_SOURCES['STANDARD']
-        elif re.search(r'(?i)(regulation|directive|zakon|uredba)', sample):
+        elif self.GENERIC_REGULATION_PATTERN.search(sample):
             return DOCUMENT_SOURCES['REGULATION']
         
         return DOCUMENT_SOURCES['UNKNOWN']
     
     def _clean_page_content(self, content: str) -> str:
         """Remove headers, footers, and normalize text."""
-        lines = content.split('\n')
+        lines = content.splitlines()
         
-        # Remove empty lines at start/end
-        while lines and not lines[0].strip():
-            lines.pop(0)
-        while lines and not lines[-1].strip():
-            lines.pop()
+        # Remove empty lines at start/end (index scan, one slice)
+        start, end = 0, len(lines)
+        while start < end and not lines[start].strip():
+            start += 1
+        while end > start and not lines[end - 1].strip():
+            end -= 1
         
-        if not lines:
+        if start == end:
             return ""
+        if start or end < len(lines):
+            lines = lines[start:end]
         
         if len(lines) <= self.header_footer_lines * 2:
             return '\n'.join(lines)
@@ -204,8 +386,8 @@ class PageAwareChunker:
         
         # Normalize whitespace
         content = '\n'.join(lines)
-        content = re.sub(r'\n{3,}', '\n\n', content)  # Max 2 newlines
-        content = re.sub(r'[ \t]+', ' ', content)  # Normalize spaces
+        content = self.MULTI_NEWLINE_PATTERN.sub('\n\n', content)  # Max 2 newlines
+        content = self.MULTI_SPACE_PATTERN.sub(' ', content)  # Normalize spaces
         
         return content.strip()
     
@@ -216,24 +398,7 @@ class PageAwareChunker:
         if not line:
             return False
         
-        # Page numbers in various formats
-        if re.match(r'^(?:Page\s+)?\d+(?:\s+of\s+\d+)?$', line, re.I):
-            return True
-        if re.match(r'^(?:Stranica\s+)?\d+(?:\s+od\s+\d+)?$', line, re.I):
-            return True
-        if re.match(r'^-\s*\d+\s*-$', line):  # - 1 -
-            return True
-        
-        # Date stamps
-        if re.match(r'^\d{1,2}[./]\d{1,2}[./]\d{2,4}', line):
-            return True
-        
-        # Document identifiers
-        if re.match(r'^(?:Doc|Document|ID)[:\s]+[\w-]+$', line, re.I):
-            return True
-        
-        # Copyright lines
-        if re.search(r'(?i)^.{0,10}(copyright|©|\(c\))', line):
+        if self.HEADER_FOOTER_PATTERN.match(line):
             return True
         
         # Very short lines with special chars (likely decorative)
@@ -244,66 +409,112 @@ class PageAwareChunker:
     
     def _extract_control_ids(self, content: str) -> List[str]:
         """Extract all control IDs (XXX-NNN or XXXX-NNN format) from content."""
-        matches = self.CONTROL_PATTERN.findall(content)
-        # Return unique IDs while preserving order
-        return list(dict.fromkeys(matches))
+        # Scan UTF-8 bytes rather than str; deduplicate while scanning, the
+        # dict keeps first-seen order
+        data = content.encode('utf-8', 'surrogatepass')
+        check_neighbours = not content.isascii()
+        seen: Dict[str, None] = {}
+        for match in self.CONTROL_PATTERN_BYTES.finditer(data):
+            start, end = match.span()
+            if check_neighbours and (
+                self._is_utf8_word_char_before(data, start)
+                or self._is_utf8_word_char_at(data, end)
+            ):
+                continue
+            seen.setdefault(match.group().decode('ascii'), None)
+        return list(seen)
+    
+    @staticmethod
+    def _contains_control_id(text: str, control_id: str) -> bool:
+        """Check for control_id in text with the same word boundaries as CONTROL_PATTERN."""
+        pos = text.find(control_id)
+        while pos >= 0:
+            end = pos + len(control_id)
+            before = text[pos - 1] if pos > 0 else ''
+            after = text[end] if end < len(text) else ''
+            if not (before and (before.isalnum() or before == '_')) and \
+                    not (after and (after.isalnum() or after == '_')):
+                return True
+            pos = text.find(control_id, pos + 1)
+        return False
+    
+    @staticmethod
+    def _is_utf8_word_char_before(data: bytes, pos: int) -> bool:
+        """Check whether the non-ASCII character ending at pos is a word character."""
+        if pos == 0 or data[pos - 1] < 0x80:
+            return False
+        start = pos - 1
+        while start > 0 and 0x80 <= data[start] < 0xC0:
+            start -= 1
+        char = data[start:pos].decode('utf-8', 'surrogatepass')
+        return char.isalnum() or char == '_'
+    
+    @staticmethod
+    def _is_utf8_word_char_at(data: bytes, pos: int) -> bool:
+        """Check whether the non-ASCII character starting at pos is a word character."""
+        if pos >= len(data) or data[pos] < 0x80:
+            return False
+        end = pos + 1
+        while end < len(data) and 0x80 <= data[end] < 0xC0:
+            end += 1
+        char = data[pos:end].decode('utf-8', 'surrogatepass')
+        return char.isalnum() or char == '_'
     
     def _extract_section_title(self, content: str, page_num: int) -> Optional[str]:
         """Extract section title from page content."""
-        lines = content.split('\n')[:15]  # Check first 15 lines
-        
-        for line in lines:
-            line = line.strip()
-            if not line or len(line) > 150:  # Skip empty or too long
-                continue
-            
-            for pattern in self.SECTION_PATTERNS:
-                match = pattern.match(line)
+        # Check first 15 lines, walking newlines instead of splitting the page
+        pos = 0
+        for _ in range(15):
+            nl = content.find('\n', pos)
+            line = content[pos:nl if nl >= 0 else None].strip()
+            # Skip empty or too long
+            if line and len(line) <= 150:
+                # All caps headers are the common case; a plain string test
+                # accepts them without the regex (which still covers edge
+                # whitespace the predicate rejects)
+                if (3 <= len(line) <= 51 and line.isascii() and line.isupper()
+                        and line[0].isalpha() and line.replace(' ', '').isalpha()):
+                    return line[:200]
+                match = self.SECTION_PATTERN.match(line)
                 if match:
-                    # Extract the title part
-                    if match.groups():
-                        title = match.group(1)
-                    else:
-                        title = line
+                    # Numbered sections carry the title after the number
+                    title = match.group('title') or line
                     return title[:200]  # Cap length at 200 chars
+            if nl < 0:
+                break
+            pos = nl + 1
         
         return None
     
     def _detect_spillover(self, content: str) -> bool:
         """Detect if content likely continues on next page."""
-        lines = content.split('\n')
-        if not lines:
-            return False
-        
-        # Get last non-empty line
-        last_line = ""
-        for line in reversed(lines):
-            if line.strip():
-                last_line = line.strip()
-                break
-        
-        if not last_line:
+        # Get last non-empty line without splitting the whole page
+        content = content.rstrip()
+        if not content:
             return False
+        last_line = content[content.rfind('\n') + 1:].strip()
         
         # Strong indicators of continuation
         if last_line.endswith((',', '-', ':', ';')):
             return True
         
         # No sentence terminator and substantial content
-        if len(last_line) > 40 and not re.search(r'[.!?]\s*$', last_line):
+        # (last_line is stripped, so checking the final character is enough)
+        if len(last_line) > 40 and last_line[-1] not in '.!?':
             return True
         
         # Bullet or list item without termination
-        if re.match(r'^[\d•◦▪→▸]\s*.+', last_line) and not last_line.endswith('.'):
+        first_char = last_line[0]
+        if (len(last_line) > 1 and (first_char.isdecimal() or first_char in '•◦▪→▸')
+                and not last_line.endswith('.')):
             return True
         
-        # Incomplete parenthesis or quotes
-        if last_line.count('(') > last_line.count(')'):
-            return True
-        if last_line.count('"') % 2 != 0:
+        # Incomplete parenthesis or quotes; closers are only counted when
+        # the line has an opener at all
+        open_parens = last_line.count('(')
+        if open_parens and open_parens > last_line.count(')'):
             return True
-        
-        return False
+        return last_line.count('"') % 2 != 0
     
     def _chunk_page_content(
         self,
@@ -335,10 +546,35 @@ class PageAwareChunker:
         
         # Split large pages into semantic chunks
         segments = self._split_semantic_segments(content)
+        page_ids = metadata.control_ids
+        
+        # Optionally keep the whole page as a parent of its segments
+        parent_id = None
+        if self.emit_parents:
+            parent_id = uuid.uuid4().hex
+            chunks.append({
+                'content': content,
+                'page_start': metadata.page_start,
+                'page_end': metadata.page_end,
+                'page_anchor': metadata.page_anchor,
+                'control_ids': metadata.control_ids,
+                'doc_type': metadata.doc_type,
+                'section_title': metadata.section_title,
+                'chunk_metadata': {
+                    'page': page_num,
+                    'chunk_id': parent_id,
+                    'is_parent': True,
+                    'children': list(range(len(segments))),
+                }
+            })
         
         for idx, segment in enumerate(segments):
-            # Each segment inherits page metadata but extracts its own control IDs
-            segment_control_ids = self._extract_control_ids(segment)
+            # Each segment inherits page metadata; partition the page's control
+            # IDs with bounded substring searches instead of rescanning with
+            # the regex
+            segment_control_ids = [
+                cid for cid in page_ids if self._contains_control_id(segment, cid)
+            ]
             
             chunks.append({
                 'content': segment,
@@ -356,77 +592,123 @@ class PageAwareChunker:
                     'total_segments': len(segments),
                 }
             })
+            if parent_id:
+                chunks[-1]['chunk_metadata']['parent_id'] = parent_id
         
         return chunks
     
     def _split_semantic_segments(self, content: str) -> List[str]:
         """Split content into semantic segments respecting boundaries."""
         segments = []
+        max_size = self.max_chunk_size
+        min_size = self.min_chunk_size
         
         # Try splitting by paragraphs first
         paragraphs = content.split('\n\n')
         
-        current_segment = ""
+        # Accumulate parts and join once per segment; current_len tracks the
+        # joined length (including separators) so the string never regrows
+        current_parts: List[str] = []
+        current_len = 0
         for para in paragraphs:
             para = para.strip()
             if not para:
                 continue
+            para_len = len(para)
                 
             # If adding paragraph exceeds max, save current and start new
-            if current_segment and len(current_segment) + len(para) + 2 > self.max_chunk_size:
-                if len(current_segment) >= self.min_chunk_size:
-                    segments.append(current_segment.strip())
-                    current_segment = para
+            if current_parts and current_len + para_len + 2 > max_size:
+                if current_len >= min_size:
+                    segments.append("\n\n".join(current_parts))
+                    current_parts = [para]
+                    current_len = para_len
                 else:
                     # Current too small, must combine
-                    current_segment += "\n\n" + para
+                    current_parts.append(para)
+                    current_len += para_len + 2
                     # If combined is still too large, force split
-                    if len(current_segment) > self.max_chunk_size:
-                        segments.append(current_segment[:self.max_chunk_size].strip())
-                        current_segment = current_segment[self.max_chunk_size:].strip()
+                    if current_len > max_size:
+                        combined = "\n\n".join(current_parts)
+                        segments.append(combined[:max_size].strip())
+                        remainder = combined[max_size:].strip()
+                        current_parts = [remainder] if remainder else []
+                        current_len = len(remainder)
             else:
-                current_segment += ("\n\n" if current_segment else "") + para
+                current_parts.append(para)
+                current_len += para_len + (2 if current_len else 0)
         
         # Add final segment
-        if current_segment:
-            segments.append(current_segment.strip())
+        if current_parts:
+            segments.append("\n\n".join(current_parts))
         
         # Handle segments that are still too large
         final_segments = []
         for segment in segments:
-            if len(segment) <= self.max_chunk_size:
+            if len(segment) <= max_size:
                 final_segments.append(segment)
             else:
                 # Force split at sentence boundaries
-                sentences = re.split(r'(?<=[.!?])\s+', segment)
-                temp = ""
+                sentences = self.SENTENCE_BOUNDARY_PATTERN.split(segment)
+                temp_parts: List[str] = []
+                temp_len = 0
                 for sent in sentences:
-                    if temp and len(temp) + len(sent) + 1 > self.max_chunk_size:
-                        final_segments.append(temp.strip())
-                        temp = sent
+                    sent_len = len(sent)
+                    if sent_len > max_size:
+                        # A single sentence over the limit is cut at word
+                        # boundaries so no segment exceeds max_chunk_size
+                        if temp_len:
+                            final_segments.append(" ".join(temp_parts).strip())
+                            temp_parts = []
+                            temp_len = 0
+                        final_segments.extend(self._hard_split_long(sent))
+                    elif temp_len and temp_len + sent_len + 1 > max_size:
+                        final_segments.append(" ".join(temp_parts).strip())
+                        temp_parts = [sent]
+                        temp_len = sent_len
+                    elif temp_len:
+                        temp_parts.append(sent)
+                        temp_len += sent_len + 1
                     else:
-                        temp += (" " if temp else "") + sent
-                if temp:
-                    final_segments.append(temp.strip())
+                        temp_parts = [sent]
+                        temp_len = sent_len
+                if temp_len:
+                    final_segments.append(" ".join(temp_parts).strip())
         
         return final_segments
     
-    def _connect_spillovers(self, chunks: List[Dict[str, Any]]) -> None:
-        """Connect spillover pages by marking continuations."""
-        for i in range(len(chunks) - 1):
-            curr = chunks[i]
-            next_chunk = chunks[i + 1]
+    def _hard_split_long(self, text: str) -> Iterator[str]:
+        """Yield pieces of at most max_chunk_size, preferring word boundaries."""
+        max_size = self.max_chunk_size
+        start = 0
+        length = len(text)
+        while start < length:
+            end = start + max_size
+            next_start = end
+            if end < length:
+                # Break at the last space past min_chunk_size, if any
+                space = text.rfind(' ', start + self.min_chunk_size, end + 1)
+                if space > start:
+                    end = space
+                    next_start = space + 1
+            piece = text[start:end].strip()
+            if piece:
+                yield piece
+            start = next_start
+    
+    def _connect_spillover_pair(self, curr: Dict[str, Any], next_chunk: Dict[str, Any]) -> None:
+        """Mark a continuation between two consecutive chunks."""
+        # If current has spillover and next is consecutive page
+        if (curr['chunk_metadata'].get('is_spillover') and 
+            next_chunk['page_start'] == curr['page_end'] + 1):
             
-            # If current has spillover and next is consecutive page
-            if (curr['chunk_metadata'].get('is_spillover') and 
-                next_chunk['page_start'] == curr['page_end'] + 1):
-                
-                # Check if they share control IDs (indicates same control continues)
-                shared_controls = set(curr['control_ids']) & set(next_chunk['control_ids'])
-                if shared_controls:
-                    # Mark the connection
-                    curr['chunk_metadata']['continues_to'] = next_chunk['page_start']
-                    next_chunk['chunk_metadata']['continues_from'] = curr['page_end']
-                    # Add shared control IDs to metadata for reference
-                    curr['chunk_metadata']['continued_controls'] = list(shared_controls)
-                    next_chunk['chunk_metadata']['continued_controls'] = list(shared_controls)
\ No newline at end of file
+            # Check if they share control IDs (indicates same control continues);
+            # one set for membership, shared IDs kept in the current chunk's order
+            next_ids = set(next_chunk['control_ids'])
+            shared_controls = [cid for cid in curr['control_ids'] if cid in next_ids]
+            if shared_controls:
+                # Mark the connection
+                curr['chunk_metadata']['continues_to'] = next_chunk['page_start']
+                next_chunk['chunk_metadata']['continues_from'] = curr['page_end']
+                # Add shared control IDs to metadata for reference
+                curr['chunk_metadata']['continued_controls'] = shared_controls
+                next_chunk['chunk_metadata']['continued_controls'] = list(shared_controls)
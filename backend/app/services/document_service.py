@@ -1,16 +1,24 @@
 """Document service for handling document upload and processing."""
 
+import asyncio
+import hashlib
 import logging
 import mimetypes
 import os
+import threading
 import uuid
-from datetime import datetime
+import weakref
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, BinaryIO
+from typing import AsyncIterator, List, Optional, BinaryIO
 
+import redis.asyncio as redis
 from fastapi import HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models.document import ProcessedDocument
 from app.repositories.document import ProcessedDocumentRepository
 from app.schemas.document import ProcessedDocumentCreate, DocumentStatsResponse
@@ -18,60 +26,160 @@ from app.schemas.document import ProcessedDocumentCreate, DocumentStatsResponse
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Document stats back a dashboard widget, so a short TTL is acceptable.
+# Entries live in Redis so uploads, deletes and the processing worker can
+# invalidate them from any process.
+DOCUMENT_STATS_CACHE_PREFIX = "document_stats"
+DOCUMENT_STATS_CACHE_TTL = timedelta(seconds=30)
+
+# One Redis client per event loop: the API process shares a single client and
+# pool, while worker jobs (each run under its own asyncio.run) get a client
+# that is dropped together with their loop
+_stats_cache_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Upload writes run in the default thread pool, which other blocking work
+# shares; cap how many of its threads concurrent uploads can occupy
+UPLOAD_WRITE_CONCURRENCY = 32
+upload_write_slots = asyncio.Semaphore(UPLOAD_WRITE_CONCURRENCY)
+
+
+async def run_upload_io(func, *args):
+    """Run a blocking upload file operation in a worker thread."""
+    async with upload_write_slots:
+        return await asyncio.to_thread(func, *args)
+
+
+@lru_cache(maxsize=16)
+def mime_type_for_suffix(suffix: str) -> Optional[str]:
+    """Guess a MIME type from a lowercase file extension such as ".pdf"."""
+    return mimetypes.guess_type(f"file{suffix}")[0]
+
+
+def get_file_extension(filename: str) -> str:
+    """Lowercase extension of a file name including the dot, as Path.suffix gives it."""
+    dot = filename.rfind(".")
+    if 0 < dot < len(filename) - 1:
+        return filename[dot:].lower()
+    return ""
+
+
+def has_path_traversal(filename: str) -> bool:
+    """Whether a file name contains a path separator or a parent reference."""
+    # Plain substring checks use CPython's memchr-based search and beat both a
+    # compiled regex and a character-set scan on file names
+    return ".." in filename or "/" in filename or "\\" in filename
+
+
+def get_stats_cache() -> redis.Redis:
+    """Redis client for the document stats cache, shared within the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _stats_cache_clients.get(loop)
+    if client is None:
+        client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _stats_cache_clients[loop] = client
+    return client
+
+
+def document_stats_cache_key(organization_id: uuid.UUID) -> str:
+    """Redis key for an organization's cached document stats."""
+    return f"{DOCUMENT_STATS_CACHE_PREFIX}:{organization_id}"
+
+
+async def invalidate_document_stats(organization_id: Optional[uuid.UUID]) -> None:
+    """Drop an organization's cached document stats.
+    
+    Global documents (no organization) are not part of the stats, so there is
+    nothing to invalidate for them. Cache errors are logged and ignored.
+    """
+    if organization_id is None:
+        return
+    try:
+        await get_stats_cache().delete(document_stats_cache_key(organization_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate document stats for {organization_id}: {e}")
+
 
 class DocumentService:
     """Service for document operations."""
 
     # Configuration
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
-    ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt"}
-    ALLOWED_MIME_TYPES = {
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+    ALLOWED_EXTENSIONS = frozenset({".pdf", ".docx", ".txt"})
+    ALLOWED_MIME_TYPES = frozenset({
         "application/pdf",
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         "text/plain",
-    }
+    })
     UPLOAD_DIR = Path("/app/uploads")
+    GLOBAL_UPLOAD_DIR = UPLOAD_DIR / "global"
+
+    # Upload directories are created once per process, not per request
+    _upload_dirs_ready = False
+    _upload_dirs_lock = threading.Lock()
 
     def __init__(self, db: AsyncSession):
         self.db = db
         self.document_repo = ProcessedDocumentRepository(db)
+        # Documents uploaded inside bulk_upload_transaction(), awaiting commit
+        self._bulk_uploads: Optional[List[ProcessedDocument]] = None
         
-        # Ensure upload directory exists
-        try:
-            self.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Upload directory ensured at: {self.UPLOAD_DIR}")
-        except Exception as e:
-            logger.error(f"Failed to create upload directory: {e}")
-            raise
+        if not DocumentService._upload_dirs_ready:
+            self._ensure_upload_dirs()
+
+    @classmethod
+    def _ensure_upload_dirs(cls) -> None:
+        """Create the upload directories if they do not exist yet."""
+        with cls._upload_dirs_lock:
+            if cls._upload_dirs_ready:
+                return
+            try:
+                cls.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+                cls.GLOBAL_UPLOAD_DIR.mkdir(exist_ok=True)
+                logger.info(f"Upload directory ensured at: {cls.UPLOAD_DIR}")
+            except Exception as e:
+                logger.error(f"Failed to create upload directory: {e}")
+                raise
+            cls._upload_dirs_ready = True
 
     async def upload_document(
         self,
         file: UploadFile,
         document_data: ProcessedDocumentCreate,
         organization_id: uuid.UUID,
+        commit: bool = True,
     ) -> ProcessedDocument:
-        """Upload and store a document for processing."""
+        """Upload and store a document for processing.
+        
+        With commit=False the record is only flushed; committing and queueing
+        it for processing is left to the caller. Uploads inside
+        bulk_upload_transaction() never commit on their own.
+        """
+        commit = commit and self._bulk_uploads is None
         
         logger.info(f"Starting document upload for org {organization_id}")
         
+        # Refuse early, before any bytes are written, if processing is backed up
+        self._check_processing_capacity()
+        
         # Validate file
         self._validate_file(file)
         logger.info(f"File validation passed for {file.filename}")
         
         # Generate unique filename
-        file_extension = Path(file.filename).suffix.lower()
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        file_extension = get_file_extension(file.filename)
+        unique_filename = uuid.uuid4().hex + file_extension
         file_path = self.UPLOAD_DIR / unique_filename
         logger.info(f"Generated file path: {file_path}")
         
         # Save file to disk
         try:
-            content = await file.read()
-            logger.info(f"Read {len(content)} bytes from uploaded file")
-            
-            with open(file_path, "wb") as buffer:
-                buffer.write(content)
-                logger.info(f"File saved successfully to {file_path}")
+            file_size, content_hash = await self._save_upload(file, file_path)
+            logger.info(f"Saved {file_size} bytes to {file_path}")
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to save file: {str(e)}", exc_info=True)
             raise HTTPException(
@@ -79,6 +187,11 @@ class DocumentService:
                 detail=f"Failed to save file: {str(e)}"
             )
         
+        # Identical content was already uploaded; reuse it and its embeddings
+        existing = await self._find_duplicate(content_hash, organization_id, file_path)
+        if existing:
+            return existing
+        
         # Create document record
         try:
             logger.info("Creating document record in database")
@@ -88,20 +201,26 @@ class DocumentService:
                 is_global=False,
                 title=document_data.title,
                 file_name=file.filename,
-                file_size=len(content),
+                file_size=file_size,
                 mime_type=file.content_type,
                 status="pending",
-                upload_date=datetime.now(),
                 processing_metadata={
                     "file_path": str(file_path),
                     "tags": document_data.tags,
                     "upload_source": "api",
-                }
+                },
+                content_hash=content_hash,
             )
             logger.info(f"Document record created with ID: {document.id}")
             
+            if not commit:
+                if self._bulk_uploads is not None:
+                    self._bulk_uploads.append(document)
+                return document
+            
             await self.db.commit()
             logger.info("Transaction committed successfully")
+            await invalidate_document_stats(organization_id)
             
             # Enqueue document for background processing
             try:
@@ -135,36 +254,46 @@ class DocumentService:
         uploaded_by: str,
         document_type: Optional[str] = None,
         source: Optional[str] = None,
+        commit: bool = True,
     ) -> ProcessedDocument:
-        """Upload a global document accessible to all organizations."""
+        """Upload a global document accessible to all organizations.
+        
+        commit behaves as in upload_document.
+        """
+        commit = commit and self._bulk_uploads is None
+        
+        # Refuse early, before any bytes are written, if processing is backed up
+        self._check_processing_capacity()
         
         # Validate file
         self._validate_file(file)
         
         # Generate unique filename
-        file_extension = Path(file.filename).suffix.lower()
-        unique_filename = f"global_{uuid.uuid4()}{file_extension}"
-        file_path = self.UPLOAD_DIR / "global" / unique_filename
-        
-        # Ensure global directory exists
-        file_path.parent.mkdir(exist_ok=True)
+        file_extension = get_file_extension(file.filename)
+        unique_filename = "global_" + uuid.uuid4().hex + file_extension
+        file_path = self.GLOBAL_UPLOAD_DIR / unique_filename
         
         # Save file to disk
         try:
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+            file_size, content_hash = await self._save_upload(file, file_path)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to save file: {str(e)}"
             )
         
+        # Identical content was already uploaded; reuse it and its embeddings
+        existing = await self._find_duplicate(content_hash, None, file_path)
+        if existing:
+            return existing
+        
         # Create global document record
         document = await self.document_repo.create_global_document(
             title=document_data.title,
             file_name=file.filename,
-            file_size=len(content),
+            file_size=file_size,
             uploaded_by=uploaded_by,
             document_type=document_type,
             source=source,
@@ -173,10 +302,15 @@ class DocumentService:
                 "file_path": str(file_path),
                 "tags": document_data.tags,
                 "upload_source": "admin_api",
-            }
+            },
+            content_hash=content_hash,
+            commit=commit,
         )
         
-        await self.db.commit()
+        if not commit:
+            if self._bulk_uploads is not None:
+                self._bulk_uploads.append(document)
+            return document
         
         # Enqueue document for background processing
         try:
@@ -193,6 +327,114 @@ class DocumentService:
             
         return document
 
+    @asynccontextmanager
+    async def bulk_upload_transaction(self) -> AsyncIterator[None]:
+        """Group several uploads into a single transaction.
+        
+        Uploads made inside the block only flush their records. The records are
+        committed once on exit and then queued for processing. If the block
+        raises, the transaction is rolled back and the uploaded files removed.
+        """
+        uploads = self._bulk_uploads = []
+        try:
+            yield
+            await self.db.commit()
+        except BaseException:
+            await self.db.rollback()
+            for document in uploads:
+                file_path = (document.processing_metadata or {}).get("file_path")
+                if not file_path:
+                    continue
+                try:
+                    Path(file_path).unlink(missing_ok=True)
+                except Exception as cleanup_error:
+                    logger.error(f"Failed to clean up file {file_path}: {cleanup_error}")
+            raise
+        finally:
+            self._bulk_uploads = None
+        
+        logger.info(f"Committed {len(uploads)} uploaded documents in one transaction")
+        for organization_id in {document.organization_id for document in uploads}:
+            await invalidate_document_stats(organization_id)
+        for document in uploads:
+            self._enqueue_processing(document)
+
+    async def upload_global_documents_bulk(
+        self,
+        files: List[UploadFile],
+        document_data_list: List[ProcessedDocumentCreate],
+        uploaded_by: str,
+        document_type: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> List[ProcessedDocument]:
+        """Upload several global documents with a single INSERT and commit.
+        
+        Every file is validated before any is written. If staging a file or
+        creating the records fails, all files written so far are removed.
+        """
+        if len(files) != len(document_data_list):
+            raise HTTPException(
+                status_code=400,
+                detail="Each uploaded file needs its own document data"
+            )
+        
+        self._check_processing_capacity()
+        for file in files:
+            self._validate_file(file)
+        
+        staged_paths: List[Path] = []
+        # Per file: an existing document with the same content, or None if new
+        duplicates: List[Optional[ProcessedDocument]] = []
+        try:
+            records = []
+            for file, document_data in zip(files, document_data_list):
+                file_extension = get_file_extension(file.filename)
+                file_path = self.GLOBAL_UPLOAD_DIR / ("global_" + uuid.uuid4().hex + file_extension)
+                staged_paths.append(file_path)
+                file_size, content_hash = await self._save_upload(file, file_path)
+                
+                existing = await self._find_duplicate(content_hash, None, file_path)
+                duplicates.append(existing)
+                if existing:
+                    continue
+                
+                records.append({
+                    "title": document_data.title,
+                    "file_name": file.filename,
+                    "file_size": file_size,
+                    "uploaded_by": uploaded_by,
+                    "document_type": document_type,
+                    "source": source,
+                    "mime_type": file.content_type,
+                    "processing_metadata": {
+                        "file_path": str(file_path),
+                        "tags": document_data.tags,
+                        "upload_source": "admin_api_bulk",
+                    },
+                    "content_hash": content_hash,
+                })
+            
+            documents = await self.document_repo.create_global_documents(records)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            for file_path in staged_paths:
+                try:
+                    file_path.unlink(missing_ok=True)
+                except Exception as cleanup_error:
+                    logger.error(f"Failed to clean up file {file_path}: {cleanup_error}")
+            raise
+        
+        logger.info(f"Created {len(documents)} global documents in one transaction")
+        
+        # Enqueue documents for background processing
+        for document in documents:
+            self._enqueue_processing(document)
+        
+        # Return documents in upload order, reusing existing ones for duplicates
+        created = iter(documents)
+        return [existing or next(created) for existing in duplicates]
+
     async def get_documents(
         self,
         organization_id: uuid.UUID,
@@ -212,19 +454,17 @@ class DocumentService:
             offset: Offset for pagination
             include_global: Whether to include global documents (defaults to False for security)
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         logger.info(f"[DOCUMENT_SERVICE] Getting documents for org {organization_id}, include_global: {include_global}")
         
         if search:
-            # TODO: Update search_by_title to support global documents
-            documents = await self.document_repo.search_by_title(
+            documents, total = await self.document_repo.search_by_title(
                 organization_id=organization_id,
                 search_term=search,
+                status=status,
                 limit=limit,
+                offset=offset,
+                include_global=include_global,
             )
-            total = len(documents)
         else:
             documents = await self.document_repo.get_by_organization(
                 organization_id=organization_id,
@@ -235,12 +475,11 @@ class DocumentService:
             )
             
             # Get total count for pagination
-            all_docs = await self.document_repo.get_by_organization(
+            total = await self.document_repo.count_by_organization(
                 organization_id=organization_id,
                 status=status,
                 include_global=include_global,
             )
-            total = len(all_docs)
         
         logger.info(f"[DOCUMENT_SERVICE] Found {total} documents (include_global: {include_global})")
         return documents, total
@@ -264,12 +503,11 @@ class DocumentService:
         )
         
         # Get total count
-        all_docs = await self.document_repo.get_global_documents(
+        total = await self.document_repo.count_global_documents(
             status=status,
             document_type=document_type,
             source=source,
         )
-        total = len(all_docs)
         
         return documents, total
 
@@ -302,11 +540,23 @@ class DocumentService:
         
         return document
 
+    async def count_document_chunks(self, document_id: uuid.UUID) -> int:
+        """Count the chunks of a document without loading them."""
+        return await self.document_repo.count_chunks(document_id)
+
     async def get_document_stats(
         self,
         organization_id: uuid.UUID,
     ) -> DocumentStatsResponse:
-        """Get document processing statistics."""
+        """Get document processing statistics, cached briefly per organization."""
+        
+        cache_key = document_stats_cache_key(organization_id)
+        try:
+            cached = await get_stats_cache().get(cache_key)
+            if cached is not None:
+                return DocumentStatsResponse.model_validate_json(cached)
+        except Exception as e:
+            logger.warning(f"Document stats cache read failed: {e}")
         
         stats = await self.document_repo.get_processing_stats(organization_id)
         
@@ -320,7 +570,13 @@ class DocumentService:
             "avg_chunks_per_doc": 0,
         }
         
-        return DocumentStatsResponse(**stats)
+        response = DocumentStatsResponse(**stats)
+        try:
+            await get_stats_cache().setex(cache_key, DOCUMENT_STATS_CACHE_TTL, response.model_dump_json())
+        except Exception as e:
+            logger.warning(f"Document stats cache write failed: {e}")
+        
+        return response
 
     async def delete_document(
         self,
@@ -334,35 +590,29 @@ class DocumentService:
         if not document:
             return False
         
-        # Delete physical file
-        if document.processing_metadata and "file_path" in document.processing_metadata:
-            file_path = Path(document.processing_metadata["file_path"])
-            if file_path.exists():
-                try:
-                    file_path.unlink()
-                except Exception:
-                    pass  # Log error but continue with database deletion
-        
-        # Delete embeddings from PGVector first
-        from app.services.vector_service import VectorService
-        vector_service = VectorService(self.db)
-        try:
-            await vector_service.delete_documents(
-                document_id=document_id,
-                organization_id=organization_id
-            )
-        except Exception as e:
-            # Log error but continue - embeddings might not exist
-            pass
-        
-        # Delete database record (cascade will handle chunks)
+        # Embeddings are stored on the document's chunks, which the database
+        # removes through the ON DELETE CASCADE foreign key. The physical file
+        # is only removed once the record deletion has been committed, so a
+        # failed delete never leaves a record without its file.
+        file_path = (document.processing_metadata or {}).get("file_path")
         success = await self.document_repo.delete(document_id)
         
         if success:
             await self.db.commit()
+            await self._remove_file(file_path)
+            await invalidate_document_stats(document.organization_id)
         
         return success
 
+    async def _remove_file(self, file_path: Optional[str]) -> None:
+        """Delete a stored upload in a worker thread, logging any failure."""
+        if not file_path:
+            return
+        try:
+            await asyncio.to_thread(Path(file_path).unlink, missing_ok=True)
+        except Exception as e:
+            logger.error(f"Failed to delete file {file_path}: {e}")
+
     async def get_failed_documents(
         self,
         organization_id: uuid.UUID,
@@ -370,11 +620,110 @@ class DocumentService:
         """Get all failed documents for reprocessing."""
         return await self.document_repo.get_failed_documents(organization_id)
 
+    def _enqueue_processing(self, document: ProcessedDocument) -> None:
+        """Queue a committed document for background processing."""
+        from app.services.background_jobs import enqueue_document_processing
+        try:
+            job_id = enqueue_document_processing(
+                document_id=document.id,
+                organization_id=document.organization_id,
+                is_global=document.is_global
+            )
+            logger.info(f"Document {document.id} enqueued for processing with job ID: {job_id}")
+        except Exception as e:
+            # Don't fail the upload if enqueueing fails
+            logger.error(f"Failed to enqueue document {document.id} for processing: {e}")
+
+    def _check_processing_capacity(self) -> None:
+        """Reject uploads with 503 while the processing queue is full."""
+        from app.services.background_jobs import document_queue_is_full
+        try:
+            queue_full = document_queue_is_full()
+        except Exception as e:
+            # Queue state is advisory; never fail an upload because of it
+            logger.warning(f"Failed to check document processing queue: {e}")
+            return
+        
+        if queue_full:
+            raise HTTPException(
+                status_code=503,
+                detail="Document processing queue is full, please try again later"
+            )
+
+    @staticmethod
+    def _write_chunk(buffer: BinaryIO, hasher, chunk: bytes) -> None:
+        """Write one upload chunk and add it to the content hash."""
+        hasher.update(chunk)
+        buffer.write(chunk)
+
+    @staticmethod
+    def _close_upload(buffer: BinaryIO) -> None:
+        """Close an upload file, dropping it from the page cache if configured."""
+        try:
+            if settings.UPLOAD_FADVISE_DONTNEED and hasattr(os, "posix_fadvise"):
+                # Only clean pages can be dropped, so write the data out first
+                buffer.flush()
+                os.fdatasync(buffer.fileno())
+                os.posix_fadvise(buffer.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError as e:
+            logger.warning(f"Failed to drop upload from page cache: {e}")
+        finally:
+            buffer.close()
+
+    async def _find_duplicate(
+        self,
+        content_hash: str,
+        organization_id: Optional[uuid.UUID],
+        file_path: Path,
+    ) -> Optional[ProcessedDocument]:
+        """Return an existing document with this content, removing the new copy."""
+        existing = await self.document_repo.find_by_content_hash(content_hash, organization_id)
+        if not existing:
+            return None
+        
+        logger.info(f"Upload matches existing document {existing.id}; discarding {file_path}")
+        try:
+            await asyncio.to_thread(file_path.unlink, missing_ok=True)
+        except Exception as cleanup_error:
+            logger.error(f"Failed to clean up file: {cleanup_error}")
+        return existing
+
+    async def _save_upload(self, file: UploadFile, file_path: Path) -> tuple[int, str]:
+        """Stream an uploaded file to disk in chunks.
+        
+        Returns the file size and the hex BLAKE2b-128 digest of its content.
+        The size limit is enforced while streaming, so uploads without a
+        declared size cannot exceed it either. Disk I/O and hashing run in
+        worker threads (see run_upload_io) so large writes do not block the
+        event loop.
+        """
+        file_size = 0
+        hasher = hashlib.blake2b(digest_size=16)
+        buffer = await run_upload_io(open, file_path, "wb")
+        try:
+            try:
+                while chunk := await file.read(self.UPLOAD_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    if file_size > self.MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large. Maximum size is {self.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
+                        )
+                    await run_upload_io(self._write_chunk, buffer, hasher, chunk)
+            finally:
+                await run_upload_io(self._close_upload, buffer)
+        except BaseException:
+            # Never leave a partial upload behind (oversized, failed or cancelled)
+            file_path.unlink(missing_ok=True)
+            raise
+        return file_size, hasher.hexdigest()
+
     def _validate_file(self, file: UploadFile) -> None:
         """Validate uploaded file."""
         
-        # Check file size
-        if hasattr(file, 'size') and file.size > self.MAX_FILE_SIZE:
+        # Check the declared size, when the client sent one; the streamed size
+        # is enforced again while saving
+        if file.size is not None and file.size > self.MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=413,
                 detail=f"File too large. Maximum size is {self.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
@@ -382,8 +731,7 @@ class DocumentService:
         
         # Check file extension
         if file.filename:
-            file_extension = Path(file.filename).suffix.lower()
-            if file_extension not in self.ALLOWED_EXTENSIONS:
+            if get_file_extension(file.filename) not in self.ALLOWED_EXTENSIONS:
                 raise HTTPException(
                     status_code=400,
                     detail=f"File type not allowed. Allowed types: {', '.join(self.ALLOWED_EXTENSIONS)}"
@@ -397,7 +745,7 @@ class DocumentService:
             )
         
         # Security check: ensure filename doesn't contain path traversal
-        if file.filename and (".." in file.filename or "/" in file.filename or "\\" in file.filename):
+        if file.filename and has_path_traversal(file.filename):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid filename: path traversal detected"
@@ -406,13 +754,14 @@ class DocumentService:
     def _extract_metadata(self, file_path: Path, content: bytes) -> dict:
         """Extract basic metadata from file."""
         
+        file_extension = file_path.suffix.lower()
         metadata = {
             "file_size": len(content),
-            "file_extension": file_path.suffix.lower(),
+            "file_extension": file_extension,
         }
         
         # Add MIME type detection
-        mime_type, _ = mimetypes.guess_type(str(file_path))
+        mime_type = mime_type_for_suffix(file_extension)
         if mime_type:
             metadata["detected_mime_type"] = mime_type
         
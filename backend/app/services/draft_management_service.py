@@ -1,16 +1,35 @@
 """Draft management service for assessment lifecycle."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, UUID
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.assessment import Assessment
 from app.repositories.assessment import AssessmentRepository, AssessmentAuditRepository, AssessmentProgressRepository
 from app.repositories.assessment_answer_repository import AssessmentAnswerRepository
+from app.services.audit_queue import audit_queue
 
 
 logger = logging.getLogger(__name__)
 
+# Cleanup audit entries are inserted in batches of this size
+CLEANUP_AUDIT_BATCH_SIZE = 500
+
+# Attributes read when listing drafts
+DRAFT_LIST_COLUMNS = [
+    Assessment.id,
+    Assessment.title,
+    Assessment.description,
+    Assessment.security_level,
+    Assessment.organization_id,
+    Assessment.created_at,
+    Assessment.updated_at,
+    Assessment.due_date,
+    Assessment.total_controls,
+]
+
 
 class DraftManagementService:
     """Service for managing assessment drafts - resume, discard, cleanup."""
@@ -41,36 +60,29 @@ class DraftManagementService:
             Dict with success status and assessment data
         """
         try:
-            # Get assessment
-            assessment = await self.assessment_repo.get_by_id(assessment_id)
+            # Update assessment activity; only drafts can be resumed
+            assessment = await self.assessment_repo.touch_draft(assessment_id)
             if not assessment:
+                existing = await self.assessment_repo.get_by_id(assessment_id)
+                if not existing:
+                    return {
+                        "success": False,
+                        "error": f"Assessment {assessment_id} not found"
+                    }
                 return {
                     "success": False,
-                    "error": f"Assessment {assessment_id} not found"
-                }
-            
-            # Only allow resuming drafts
-            if assessment.status != "draft":
-                return {
-                    "success": False,
-                    "error": f"Cannot resume {assessment.status} assessment - only drafts can be resumed"
+                    "error": f"Cannot resume {existing.status} assessment - only drafts can be resumed"
                 }
             
             # Get current progress
             progress = await self.progress_repo.get_overall_progress(assessment_id)
             answered_count = progress.answered_controls if progress else 0
             
-            # Get answered controls for context
-            answered_controls = await self.answer_repo.get_all_for_assessment(assessment_id)
-            
-            # Update assessment activity
-            await self.assessment_repo.update(
-                assessment_id,
-                updated_at=datetime.utcnow()
-            )
+            await self.db.commit()
             
-            # Log resume action
-            await self.audit_repo.create(
+            # Log resume action; resuming only touches updated_at, so the
+            # entry is written in the background after the response
+            audit_queue.enqueue(
                 assessment_id=assessment_id,
                 user_id=user_id,
                 action="draft_resumed",
@@ -81,8 +93,6 @@ class DraftManagementService:
                 user_agent=user_agent,
             )
             
-            await self.db.commit()
-            
             logger.info(f"Draft assessment {assessment_id} resumed by user {user_id}")
             
             return {
@@ -94,7 +104,7 @@ class DraftManagementService:
                 "total_controls": assessment.total_controls or 0,
                 "completion_percentage": float(progress.completion_percentage) if progress else 0.0,
                 "last_updated": assessment.updated_at.isoformat(),
-                "resumed_at": datetime.utcnow().isoformat(),
+                "resumed_at": datetime.now(timezone.utc).isoformat(),
             }
             
         except Exception as e:
@@ -141,6 +151,8 @@ class DraftManagementService:
                     "error": f"Cannot discard {assessment.status} assessment - only drafts can be discarded"
                 }
             
+            now = datetime.now(timezone.utc)
+            
             # Get stats before deletion
             answered_controls = await self.answer_repo.count_by_assessment(assessment_id)
             
@@ -164,7 +176,7 @@ class DraftManagementService:
             await self.assessment_repo.update(
                 assessment_id,
                 status="abandoned",
-                updated_at=datetime.utcnow()
+                updated_at=now
             )
             
             await self.db.commit()
@@ -176,7 +188,7 @@ class DraftManagementService:
                 "assessment_id": str(assessment_id),
                 "title": assessment.title,
                 "answered_controls": answered_controls,
-                "discarded_at": datetime.utcnow().isoformat(),
+                "discarded_at": now.isoformat(),
                 "reason": reason,
             }
             
@@ -214,12 +226,26 @@ class DraftManagementService:
                 organization_id=organization_id,
                 limit=limit,
                 offset=offset,
+                columns=DRAFT_LIST_COLUMNS,
             )
             
-            # Enrich with progress information
+            # A partial first page already holds every match
+            if offset == 0 and len(drafts) < limit:
+                total = len(drafts)
+            else:
+                total = await self.assessment_repo.count_search_results(
+                    assigned_user_id=user_id,
+                    status_list=["draft"],
+                    organization_id=organization_id,
+                )
+            
+            # Enrich with progress information, loaded for all drafts at once
+            progress_by_draft = await self.progress_repo.get_overall_progress_bulk(
+                [draft.id for draft in drafts]
+            )
             draft_details = []
             for draft in drafts:
-                progress = await self.progress_repo.get_overall_progress(draft.id)
+                progress = progress_by_draft.get(draft.id)
                 answered_count = progress.answered_controls if progress else 0
                 completion_percentage = float(progress.completion_percentage) if progress else 0.0
                 
@@ -241,7 +267,7 @@ class DraftManagementService:
             return {
                 "success": True,
                 "drafts": draft_details,
-                "total": len(draft_details),
+                "total": total,
                 "limit": limit,
                 "offset": offset,
                 "user_id": str(user_id),
@@ -269,26 +295,23 @@ class DraftManagementService:
             Dict with cleanup results
         """
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-            
-            # Find old abandoned assessments
-            old_abandoned = await self.assessment_repo.search_assessments(
-                status_list=["abandoned"],
-                # This would need a created_before parameter in the repository
-                limit=1000,  # Large limit to check all
-            )
-            
-            # Filter by date (since we don't have created_before parameter)
-            candidates = [
-                assessment for assessment in old_abandoned
-                if assessment.updated_at < cutoff_date
-            ]
+            now = datetime.now(timezone.utc)
+            cutoff_date = now - timedelta(days=days_old)
             
             if dry_run:
+                would_cleanup_count = await self.assessment_repo.count_search_results(
+                    status_list=["abandoned"],
+                    updated_before=cutoff_date,
+                )
+                sample = await self.assessment_repo.search_assessments(
+                    status_list=["abandoned"],
+                    updated_before=cutoff_date,
+                    limit=10,  # Show first 10
+                )
                 return {
                     "success": True,
                     "dry_run": True,
-                    "would_cleanup_count": len(candidates),
+                    "would_cleanup_count": would_cleanup_count,
                     "cutoff_date": cutoff_date.isoformat(),
                     "candidates": [
                         {
@@ -296,25 +319,32 @@ class DraftManagementService:
                             "title": assessment.title,
                             "updated_at": assessment.updated_at.isoformat(),
                         }
-                        for assessment in candidates[:10]  # Show first 10
+                        for assessment in sample
                     ]
                 }
             
             # Actually perform cleanup (in a real scenario, this might archive rather than delete)
+            change_summary = f"Cleaned up abandoned draft older than {days_old} days"
             cleaned_count = 0
-            for assessment in candidates:
-                # Log cleanup action
-                await self.audit_repo.create(
-                    assessment_id=assessment.id,
-                    user_id=None,
-                    action="cleanup_abandoned",
-                    entity_type="assessment",
-                    entity_id=assessment.id,
-                    change_summary=f"Cleaned up abandoned draft older than {days_old} days",
-                    ip_address=None,
-                    user_agent="DraftCleanupService",
-                )
-                cleaned_count += 1
+            audit_rows = []
+            async for assessment_id in self.assessment_repo.stream_ids(
+                status_list=["abandoned"],
+                updated_before=cutoff_date,
+            ):
+                audit_rows.append({
+                    "assessment_id": assessment_id,
+                    "user_id": None,
+                    "action": "cleanup_abandoned",
+                    "entity_type": "assessment",
+                    "entity_id": assessment_id,
+                    "change_summary": change_summary,
+                    "ip_address": None,
+                    "user_agent": "DraftCleanupService",
+                })
+                if len(audit_rows) >= CLEANUP_AUDIT_BATCH_SIZE:
+                    cleaned_count += await self.audit_repo.create_many(audit_rows)
+                    audit_rows = []
+            cleaned_count += await self.audit_repo.create_many(audit_rows)
             
             await self.db.commit()
             
@@ -325,7 +355,7 @@ class DraftManagementService:
                 "dry_run": False,
                 "cleaned_count": cleaned_count,
                 "cutoff_date": cutoff_date.isoformat(),
-                "cleaned_at": datetime.utcnow().isoformat(),
+                "cleaned_at": now.isoformat(),
             }
             
         except Exception as e:
@@ -349,15 +379,31 @@ class DraftManagementService:
             Dict with draft statistics
         """
         try:
-            # Get all drafts
-            drafts = await self.assessment_repo.search_assessments(
-                status_list=["draft"],
-                organization_id=organization_id,
-                limit=1000,  # Large limit to get all
+            # Aggregated per security level in the database
+            level_stats = await self.assessment_repo.get_draft_statistics_by_level(
+                organization_id=organization_id
             )
             
-            # Calculate statistics
-            total_drafts = len(drafts)
+            # Combine the per-level figures in a single pass
+            total_drafts = 0
+            age_days_sum = 0.0
+            oldest_days = None
+            newest_days = None
+            completion_sum = 0.0
+            completed_drafts = 0
+            barely_started = 0
+            level_counts = {}
+            for level, stats in level_stats.items():
+                total_drafts += stats["count"]
+                age_days_sum += stats["age_days_sum"]
+                if oldest_days is None or stats["oldest_days"] > oldest_days:
+                    oldest_days = stats["oldest_days"]
+                if newest_days is None or stats["newest_days"] < newest_days:
+                    newest_days = stats["newest_days"]
+                completion_sum += stats["completion_sum"]
+                completed_drafts += stats["over_half_complete"]
+                barely_started += stats["barely_started"]
+                level_counts[level] = stats["count"]
             
             if total_drafts == 0:
                 return {
@@ -366,29 +412,8 @@ class DraftManagementService:
                     "organization_id": str(organization_id) if organization_id else None,
                 }
             
-            # Age statistics
-            now = datetime.utcnow()
-            ages = [(now - draft.created_at).days for draft in drafts]
-            avg_age_days = sum(ages) / len(ages)
-            oldest_days = max(ages)
-            newest_days = min(ages)
-            
-            # Progress statistics
-            progress_data = []
-            for draft in drafts:
-                progress = await self.progress_repo.get_overall_progress(draft.id)
-                if progress:
-                    progress_data.append(float(progress.completion_percentage))
-                else:
-                    progress_data.append(0.0)
-            
-            avg_completion = sum(progress_data) / len(progress_data) if progress_data else 0.0
-            
-            # Security level breakdown
-            level_counts = {}
-            for draft in drafts:
-                level = draft.security_level
-                level_counts[level] = level_counts.get(level, 0) + 1
+            avg_age_days = age_days_sum / total_drafts
+            avg_completion = completion_sum / total_drafts
             
             return {
                 "success": True,
@@ -400,12 +425,12 @@ class DraftManagementService:
                 },
                 "completion_statistics": {
                     "average_completion_percentage": round(avg_completion, 1),
-                    "completed_drafts": len([p for p in progress_data if p > 50.0]),
-                    "barely_started": len([p for p in progress_data if p < 10.0]),
+                    "completed_drafts": completed_drafts,
+                    "barely_started": barely_started,
                 },
                 "security_level_breakdown": level_counts,
                 "organization_id": str(organization_id) if organization_id else None,
-                "calculated_at": datetime.utcnow().isoformat(),
+                "calculated_at": datetime.now(timezone.utc).isoformat(),
             }
             
         except Exception as e:
@@ -1,50 +1,134 @@
 """Keycloak integration service for updating user attributes."""
+import asyncio
 import os
+import time
 import httpx
 from typing import Dict, Optional, List
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Seconds before the advertised expiry at which a cached token is refreshed
+TOKEN_EXPIRY_MARGIN = 30
+
+# Realm role definitions rarely change, so lookups are cached for a while
+ROLE_CACHE_TTL = 300
+
+# How long a user's roles are trusted when deciding to assign the default role
+USER_ROLES_CACHE_TTL = 60
+# Upper bound on cached users; expired entries are purged before this is hit
+USER_ROLES_CACHE_MAX_SIZE = 10000
+
 class KeycloakService:
     """Service for interacting with Keycloak Admin API."""
+
+    # Admin tokens are shared by all instances, keyed by (url, username), since
+    # a new service is constructed for nearly every request.
+    _token_cache: Dict[tuple, Dict] = {}
+    _token_lock: Optional[asyncio.Lock] = None
+
+    # Shared HTTP client so connections to Keycloak are pooled across requests
+    _client: Optional[httpx.AsyncClient] = None
+
+    # Realm roles keyed by (url, realm, role name) -> (role data, expires at)
+    _role_cache: Dict[tuple, tuple] = {}
+
+    # User role names keyed by (url, realm, user id) -> (role names, expires at)
+    _user_roles_cache: Dict[tuple, tuple] = {}
     
     def __init__(self):
         self.keycloak_url = os.getenv("KEYCLOAK_URL", "http://keycloak:8080")
         self.realm = os.getenv("KEYCLOAK_REALM", "assessment-platform")
         self.admin_username = os.getenv("KEYCLOAK_ADMIN_USERNAME", "admin")
         self.admin_password = os.getenv("KEYCLOAK_ADMIN_PASSWORD", "admin")
-        self._admin_token = None
         
         # Default role for MVP
         self.DEFAULT_ROLE = "assessment_editor"
         
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if KeycloakService._client is None or KeycloakService._client.is_closed:
+            KeycloakService._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+            )
+        return KeycloakService._client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the shared HTTP client."""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
     async def _get_admin_token(self) -> str:
-        """Get admin access token for Keycloak API."""
-        if self._admin_token:
-            # TODO: Check if token is still valid
-            return self._admin_token
-            
-        token_url = f"{self.keycloak_url}/realms/master/protocol/openid-connect/token"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                token_url,
-                data={
+        """Get admin access token for Keycloak API.
+
+        The token is reused until shortly before it expires. Once it has
+        expired, the refresh token is tried before falling back to a new
+        password grant.
+        """
+        cache_key = (self.keycloak_url, self.admin_username)
+        cached = self._token_cache.get(cache_key)
+        if cached and time.monotonic() < cached["expires_at"]:
+            return cached["access_token"]
+
+        if KeycloakService._token_lock is None:
+            KeycloakService._token_lock = asyncio.Lock()
+
+        async with KeycloakService._token_lock:
+            # Another request may have refreshed the token while we waited
+            cached = self._token_cache.get(cache_key)
+            now = time.monotonic()
+            if cached and now < cached["expires_at"]:
+                return cached["access_token"]
+
+            data = None
+            if cached and cached.get("refresh_token") and now < cached["refresh_expires_at"]:
+                data = await self._request_admin_token({
+                    "grant_type": "refresh_token",
+                    "client_id": "admin-cli",
+                    "refresh_token": cached["refresh_token"]
+                })
+
+            if data is None:
+                data = await self._request_admin_token({
                     "grant_type": "password",
                     "client_id": "admin-cli",
                     "username": self.admin_username,
                     "password": self.admin_password
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to get admin token: {response.text}")
-                raise Exception("Failed to authenticate with Keycloak")
-                
-            data = response.json()
-            self._admin_token = data["access_token"]
-            return self._admin_token
+                })
+                if data is None:
+                    raise Exception("Failed to authenticate with Keycloak")
+
+            now = time.monotonic()
+            self._token_cache[cache_key] = {
+                "access_token": data["access_token"],
+                "expires_at": now + data.get("expires_in", 60) - TOKEN_EXPIRY_MARGIN,
+                "refresh_token": data.get("refresh_token"),
+                "refresh_expires_at": now + data.get("refresh_expires_in", 0) - TOKEN_EXPIRY_MARGIN,
+            }
+            return data["access_token"]
+
+    async def _request_admin_token(self, form: Dict[str, str]) -> Optional[Dict]:
+        """Call the master realm token endpoint.
+
+        Args:
+            form: Token request form data
+
+        Returns:
+            Token response dict or None if the grant was rejected
+        """
+        token_url = f"{self.keycloak_url}/realms/master/protocol/openid-connect/token"
+
+        client = self._get_client()
+        response = await client.post(token_url, data=form)
+
+        if response.status_code != 200:
+            logger.error(f"Failed to get admin token ({form['grant_type']}): {response.text}")
+            return None
+
+        return response.json()
 
     async def _get_realm_role(self, role_name: str) -> Optional[Dict]:
         """Get realm role by name.
@@ -55,23 +139,30 @@ class KeycloakService:
         Returns:
             Role data dict or None if not found
         """
+        cache_key = (self.keycloak_url, self.realm, role_name)
+        cached = self._role_cache.get(cache_key)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+
         try:
             token = await self._get_admin_token()
             role_url = f"{self.keycloak_url}/admin/realms/{self.realm}/roles/{role_name}"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {token}"}
-                response = await client.get(role_url, headers=headers)
+            client = self._get_client()
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(role_url, headers=headers)
+            
+            if response.status_code == 200:
+                role_data = response.json()
+                self._role_cache[cache_key] = (role_data, time.monotonic() + ROLE_CACHE_TTL)
+                return role_data
+            elif response.status_code == 404:
+                logger.warning(f"Role {role_name} not found in realm {self.realm}")
+                return None
+            else:
+                logger.error(f"Failed to get role {role_name}: {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 404:
-                    logger.warning(f"Role {role_name} not found in realm {self.realm}")
-                    return None
-                else:
-                    logger.error(f"Failed to get role {role_name}: {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error getting realm role {role_name}: {e}")
             return None
@@ -85,26 +176,30 @@ class KeycloakService:
         Returns:
             List of role names
         """
+        return await self._fetch_user_roles(user_id) or []
+
+    async def _fetch_user_roles(self, user_id: str) -> Optional[List[str]]:
+        """Get user's current realm roles, or None if the lookup failed."""
         try:
             token = await self._get_admin_token()
             roles_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{user_id}/role-mappings/realm"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {token}"}
-                response = await client.get(roles_url, headers=headers)
+            client = self._get_client()
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(roles_url, headers=headers)
+            
+            if response.status_code == 200:
+                roles_data = response.json()
+                role_names = [role["name"] for role in roles_data]
+                logger.info(f"User {user_id} has roles: {role_names}")
+                return role_names
+            else:
+                logger.error(f"Failed to get user {user_id} roles: {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    roles_data = response.json()
-                    role_names = [role["name"] for role in roles_data]
-                    logger.info(f"User {user_id} has roles: {role_names}")
-                    return role_names
-                else:
-                    logger.error(f"Failed to get user {user_id} roles: {response.text}")
-                    return []
-                    
         except Exception as e:
             logger.error(f"Error getting user {user_id} roles: {e}")
-            return []
+            return None
 
     async def assign_user_role(self, user_id: str, role_name: str) -> bool:
         """Assign a realm role to a user.
@@ -117,33 +212,36 @@ class KeycloakService:
             True if successful, False otherwise
         """
         try:
-            # Get the role data
-            role_data = await self._get_realm_role(role_name)
+            # Resolve the role (usually cached) and the token together
+            role_data, token = await asyncio.gather(
+                self._get_realm_role(role_name),
+                self._get_admin_token()
+            )
             if not role_data:
                 logger.error(f"Cannot assign role {role_name}: role not found")
                 return False
             
-            token = await self._get_admin_token()
             assign_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{user_id}/role-mappings/realm"
             
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
-                
-                # Keycloak expects an array of role objects
-                payload = [role_data]
-                
-                response = await client.post(assign_url, headers=headers, json=payload)
+            client = self._get_client()
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+            
+            # Keycloak expects an array of role objects
+            payload = [role_data]
+            
+            response = await client.post(assign_url, headers=headers, json=payload)
+            
+            if response.status_code in [200, 204]:
+                logger.info(f"Successfully assigned role {role_name} to user {user_id}")
+                self._user_roles_cache.pop((self.keycloak_url, self.realm, user_id), None)
+                return True
+            else:
+                logger.error(f"Failed to assign role {role_name} to user {user_id}: {response.text}")
+                return False
                 
-                if response.status_code in [200, 204]:
-                    logger.info(f"Successfully assigned role {role_name} to user {user_id}")
-                    return True
-                else:
-                    logger.error(f"Failed to assign role {role_name} to user {user_id}: {response.text}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Error assigning role {role_name} to user {user_id}: {e}")
             return False
@@ -159,33 +257,36 @@ class KeycloakService:
             True if successful, False otherwise
         """
         try:
-            # Get the role data
-            role_data = await self._get_realm_role(role_name)
+            # Resolve the role (usually cached) and the token together
+            role_data, token = await asyncio.gather(
+                self._get_realm_role(role_name),
+                self._get_admin_token()
+            )
             if not role_data:
                 logger.error(f"Cannot remove role {role_name}: role not found")
                 return False
             
-            token = await self._get_admin_token()
             remove_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{user_id}/role-mappings/realm"
             
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
-                
-                # Keycloak expects an array of role objects
-                payload = [role_data]
-                
-                response = await client.request("DELETE", remove_url, headers=headers, json=payload)
+            client = self._get_client()
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+            
+            # Keycloak expects an array of role objects
+            payload = [role_data]
+            
+            response = await client.request("DELETE", remove_url, headers=headers, json=payload)
+            
+            if response.status_code in [200, 204]:
+                logger.info(f"Successfully removed role {role_name} from user {user_id}")
+                self._user_roles_cache.pop((self.keycloak_url, self.realm, user_id), None)
+                return True
+            else:
+                logger.error(f"Failed to remove role {role_name} from user {user_id}: {response.text}")
+                return False
                 
-                if response.status_code in [200, 204]:
-                    logger.info(f"Successfully removed role {role_name} from user {user_id}")
-                    return True
-                else:
-                    logger.error(f"Failed to remove role {role_name} from user {user_id}: {response.text}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Error removing role {role_name} from user {user_id}: {e}")
             return False
@@ -197,11 +298,66 @@ class KeycloakService:
             user_id: Keycloak user ID
             
         Returns:
-            True if successful, False otherwise
+            True if successful or the user already has the role, False otherwise
         """
+        roles = await self._get_cached_user_roles(user_id)
+        if roles is not None and self.DEFAULT_ROLE in roles:
+            logger.info(f"User {user_id} already has default role '{self.DEFAULT_ROLE}'")
+            return True
+
         logger.info(f"Assigning default role '{self.DEFAULT_ROLE}' to user {user_id}")
         return await self.assign_user_role(user_id, self.DEFAULT_ROLE)
 
+    async def _get_cached_user_roles(self, user_id: str) -> Optional[set]:
+        """Get a user's role names, cached briefly; None if the lookup failed.
+        
+        Failed lookups are not cached. Expired entries are dropped when read,
+        and the whole cache is pruned whenever it reaches its size limit.
+        """
+        cache_key = (self.keycloak_url, self.realm, user_id)
+        now = time.monotonic()
+        cached = self._user_roles_cache.get(cache_key)
+        if cached:
+            if now < cached[1]:
+                return cached[0]
+            self._user_roles_cache.pop(cache_key, None)
+
+        role_names = await self._fetch_user_roles(user_id)
+        if role_names is None:
+            return None
+
+        cache = self._user_roles_cache
+        if len(cache) >= USER_ROLES_CACHE_MAX_SIZE:
+            for key in [key for key, (_, expires_at) in cache.items() if expires_at <= now]:
+                del cache[key]
+            # Still full of live entries: evict the oldest insertions
+            while len(cache) >= USER_ROLES_CACHE_MAX_SIZE:
+                del cache[next(iter(cache))]
+
+        roles = set(role_names)
+        cache[cache_key] = (roles, time.monotonic() + USER_ROLES_CACHE_TTL)
+        return roles
+
+    async def assign_default_roles(self, user_ids: List[str]) -> Dict[str, bool]:
+        """Assign the default role to several users concurrently.
+        
+        Args:
+            user_ids: Keycloak user IDs
+            
+        Returns:
+            Dict mapping each user ID to whether the assignment succeeded
+        """
+        if not user_ids:
+            return {}
+
+        # Warm the role cache so the concurrent assignments share one lookup
+        await self._get_realm_role(self.DEFAULT_ROLE)
+
+        results = await asyncio.gather(
+            *(self.assign_user_role(user_id, self.DEFAULT_ROLE) for user_id in user_ids)
+        )
+        return dict(zip(user_ids, results))
+
     async def get_all_users(self) -> List[Dict]:
         """Get all users in the realm.
         
@@ -212,18 +368,18 @@ class KeycloakService:
             token = await self._get_admin_token()
             users_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {token}"}
-                response = await client.get(users_url, headers=headers)
+            client = self._get_client()
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(users_url, headers=headers)
+            
+            if response.status_code == 200:
+                users_data = response.json()
+                logger.info(f"Retrieved {len(users_data)} users from realm {self.realm}")
+                return users_data
+            else:
+                logger.error(f"Failed to get users: {response.text}")
+                return []
                 
-                if response.status_code == 200:
-                    users_data = response.json()
-                    logger.info(f"Retrieved {len(users_data)} users from realm {self.realm}")
-                    return users_data
-                else:
-                    logger.error(f"Failed to get users: {response.text}")
-                    return []
-                    
         except Exception as e:
             logger.error(f"Error getting all users: {e}")
             return []
@@ -241,19 +397,19 @@ class KeycloakService:
             token = await self._get_admin_token()
             user_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{user_id}"
             
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"Bearer {token}"}
-                response = await client.get(user_url, headers=headers)
+            client = self._get_client()
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(user_url, headers=headers)
+            
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 404:
+                logger.warning(f"User {user_id} not found")
+                return None
+            else:
+                logger.error(f"Failed to get user {user_id}: {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 404:
-                    logger.warning(f"User {user_id} not found")
-                    return None
-                else:
-                    logger.error(f"Failed to get user {user_id}: {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error getting user {user_id}: {e}")
             return None
@@ -278,41 +434,41 @@ class KeycloakService:
             # Get current user data
             user_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{user_id}"
             
-            async with httpx.AsyncClient() as client:
-                # Get user
-                headers = {"Authorization": f"Bearer {token}"}
-                response = await client.get(user_url, headers=headers)
-                
-                if response.status_code != 200:
-                    logger.error(f"Failed to get user {user_id}: {response.text}")
-                    return False
-                    
-                user_data = response.json()
+            client = self._get_client()
+            # Get user
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(user_url, headers=headers)
+            
+            if response.status_code != 200:
+                logger.error(f"Failed to get user {user_id}: {response.text}")
+                return False
                 
-                # Update attributes
-                current_attributes = user_data.get("attributes", {})
-                for key, value in attributes.items():
-                    current_attributes[key] = [value]  # Keycloak stores attributes as arrays
-                    
-                user_data["attributes"] = current_attributes
+            user_data = response.json()
+            
+            # Update attributes
+            current_attributes = user_data.get("attributes", {})
+            for key, value in attributes.items():
+                current_attributes[key] = [value]  # Keycloak stores attributes as arrays
                 
-                # Update user
-                response = await client.put(
-                    user_url,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    },
-                    json=user_data
-                )
+            user_data["attributes"] = current_attributes
+            
+            # Update user
+            response = await client.put(
+                user_url,
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                },
+                json=user_data
+            )
+            
+            if response.status_code in [200, 204]:
+                logger.info(f"Successfully updated user {user_id} attributes")
+                return True
+            else:
+                logger.error(f"Failed to update user {user_id}: {response.text}")
+                return False
                 
-                if response.status_code in [200, 204]:
-                    logger.info(f"Successfully updated user {user_id} attributes")
-                    return True
-                else:
-                    logger.error(f"Failed to update user {user_id}: {response.text}")
-                    return False
-                    
         except Exception as e:
             logger.error(f"Error updating user attributes: {e}")
             return False
@@ -196,9 +196,10 @@ CREATE TABLE processed_documents (
     file_size INTEGER NOT NULL, 
     mime_type VARCHAR(100), 
     status VARCHAR(50) NOT NULL, 
-    upload_date TIMESTAMP WITHOUT TIME ZONE NOT NULL, 
+    upload_date TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, 
     processed_date TIMESTAMP WITHOUT TIME ZONE, 
     processing_metadata JSONB, 
+    content_hash VARCHAR(32), 
     id UUID NOT NULL, 
     created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL, 
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL, 
@@ -645,6 +646,9 @@ CREATE INDEX ix_assessments_status ON assessments (status);
 CREATE INDEX ix_assessments_created_by ON assessments (created_by);
 CREATE INDEX ix_assessments_id ON assessments (id);
 CREATE INDEX ix_assessments_compliance_status ON assessments (compliance_status);
+CREATE INDEX idx_assessments_assigned_to ON assessments USING gin (assigned_to);
+CREATE INDEX idx_assessments_status_org_updated ON assessments (status, organization_id, updated_at);
+CREATE INDEX idx_assessments_abandoned_updated_at ON assessments (updated_at) WHERE status = 'abandoned';
 CREATE INDEX idx_templates_key_version ON document_templates (template_key, version);
 CREATE INDEX ix_document_templates_id ON document_templates (id);
 CREATE INDEX idx_templates_organization ON document_templates (organization_id);
@@ -657,6 +661,7 @@ CREATE INDEX ix_measures_id ON measures (id);
 CREATE INDEX ix_processed_documents_scope ON processed_documents (scope);
 CREATE INDEX idx_documents_global ON processed_documents (is_global, status);
 CREATE INDEX idx_documents_upload_date ON processed_documents (upload_date);
+CREATE INDEX idx_documents_org_content_hash ON processed_documents (organization_id, content_hash);
 CREATE INDEX ix_processed_documents_document_type ON processed_documents (document_type);
 CREATE INDEX ix_processed_documents_organization_id ON processed_documents (organization_id);
 CREATE INDEX ix_processed_documents_uploaded_by ON processed_documents (uploaded_by);